@@ -1,5 +1,6 @@
 # -*- mode: python ; coding: utf-8 -*-
 import os
+import sys
 from PyInstaller.utils.hooks import collect_submodules, collect_data_files
 
 block_cipher = None
@@ -30,6 +31,13 @@ for src_rel, dest_dir in data_files:
     if os.path.exists(p):
         assets.append((p, dest_dir))
 
+# Resource manifest: lets the frozen app resolve bundled files (and the
+# pre-parsed defaults) without probing the filesystem at startup
+sys.path.insert(0, os.path.join(project_dir, 'tools'))
+from make_manifest import write_manifest
+manifest_dir = globals().get('workpath', os.path.join(project_dir, 'build'))
+assets.append((write_manifest(project_dir, data_files, manifest_dir), '.'))
+
 
 a = Analysis(
     ['main.py'],
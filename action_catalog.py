@@ -0,0 +1,157 @@
+# action_catalog.py
+"""Known-action catalog built from `default keys.txt`, with typo suggestions."""
+
+
+def edit_distance(a: str, b: str) -> int:
+    """Levenshtein distance that also counts a swapped pair of letters as one edit."""
+    if a == b:
+        return 0
+    # Shared prefixes/suffixes don't change the distance; most typos leave long ones
+    start = 0
+    while start < len(a) and start < len(b) and a[start] == b[start]:
+        start += 1
+    end_a, end_b = len(a), len(b)
+    while end_a > start and end_b > start and a[end_a - 1] == b[end_b - 1]:
+        end_a -= 1
+        end_b -= 1
+    a, b = a[start:end_a], b[start:end_b]
+    before = None
+    previous = list(range(len(b) + 1))
+    for i, ca in enumerate(a, 1):
+        current = [i]
+        for j, cb in enumerate(b, 1):
+            cost = min(
+                previous[j] + 1,                # deletion
+                current[j - 1] + 1,             # insertion
+                previous[j - 1] + (ca != cb),   # substitution
+            )
+            if before is not None and j > 1 and ca == b[j - 2] and a[i - 2] == cb:
+                cost = min(cost, before[j - 2] + 1)  # transposition
+            current.append(cost)
+        before, previous = previous, current
+    return previous[-1]
+
+
+def _trigrams(word: str) -> set[str]:
+    padded = f"  {word.lower()} "
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+
+class NgramIndex:
+    """Trigram index for nearest-word lookup under edit_distance.
+
+    A word within k edits of the query shares all but at most 4k of its
+    trigrams, so only words passing that count are measured exactly; the rest
+    of the catalog is never compared.
+    """
+
+    def __init__(self, words=()):
+        self._postings: dict[str, list[str]] = {}
+        self._sizes: dict[str, int] = {}
+        for word in words:
+            self.add(word)
+
+    def add(self, word: str):
+        if word in self._sizes:
+            return
+        grams = _trigrams(word)
+        self._sizes[word] = len(grams)
+        for gram in grams:
+            self._postings.setdefault(gram, []).append(word)
+
+    def search(self, word: str, max_distance: int) -> list[tuple[int, str]]:
+        """All (distance, word) within max_distance, closest first."""
+        grams = _trigrams(word)
+        shared: dict[str, int] = {}
+        for gram in grams:
+            for candidate in self._postings.get(gram, ()):
+                shared[candidate] = shared.get(candidate, 0) + 1
+        slack = 4 * max_distance  # Trigrams one edit (or swap) can destroy
+        found = []
+        for candidate, count in shared.items():
+            if count < max(len(grams), self._sizes[candidate]) - slack:
+                continue
+            if abs(len(candidate) - len(word)) > max_distance:
+                continue
+            d = edit_distance(word, candidate)
+            if d <= max_distance:
+                found.append((d, candidate))
+        found.sort()
+        return found
+
+
+def _is_word(text: str) -> bool:
+    return text.replace("_", "").isalpha()
+
+
+def _max_distance(word: str) -> int:
+    # Allow roughly one typo per four characters
+    return max(1, min(4, len(word) // 4))
+
+
+class ActionCatalog:
+    """Validates actions against the defaults and suggests the nearest known ones.
+
+    Checking a known action is a set lookup. Arguments are free-form unless the
+    defaults only ever use word subcommands for that command (`group select 3`,
+    `group focus 3`), in which case the subcommand is checked too. The n-gram
+    indexes used for suggestions are only built once an unknown action turns up.
+    """
+
+    def __init__(self, actions):
+        self._actions = set(actions)
+        self._subcommands: dict[str, set[str]] = {}
+        for action in self._actions:
+            parts = action.split()
+            if not parts:
+                continue
+            subs = self._subcommands.setdefault(parts[0], set())
+            if len(parts) > 1:
+                subs.add(parts[1])
+        self._action_index: NgramIndex | None = None
+        self._command_index: NgramIndex | None = None
+
+    def __bool__(self) -> bool:
+        return bool(self._actions)
+
+    def _word_subcommands(self, command: str) -> set[str] | None:
+        subs = self._subcommands.get(command)
+        if subs and all(_is_word(s) for s in subs):
+            return subs
+        return None
+
+    def is_known(self, action: str) -> bool:
+        if action in self._actions:
+            return True
+        parts = action.split()
+        if len(parts) < 2 or parts[0] not in self._subcommands:
+            return False
+        words = self._word_subcommands(parts[0])
+        return words is None or parts[1] in words
+
+    def suggest(self, action: str, limit: int = 3) -> list[str]:
+        """Nearest known actions for an unknown one (empty if nothing is close)."""
+        parts = action.split()
+        if not parts:
+            return []
+        command, args = parts[0], parts[1:]
+        if not args:
+            if self._action_index is None:
+                self._action_index = NgramIndex(sorted(self._actions))
+            return [w for _, w in self._action_index.search(action, _max_distance(action))[:limit]]
+
+        if command in self._subcommands:
+            # Known command with a mistyped subcommand: a handful to compare against
+            words = self._word_subcommands(command) or set()
+            sub = args[0]
+            hits = sorted((edit_distance(sub, w), w) for w in words)
+            rest = " ".join(args[1:])
+            return [
+                " ".join(filter(None, (command, w, rest)))
+                for d, w in hits[:limit] if d <= _max_distance(sub)
+            ]
+
+        if self._command_index is None:
+            self._command_index = NgramIndex(sorted(self._subcommands))
+        hits = self._command_index.search(command, _max_distance(command))
+        return [" ".join([w] + args) for _, w in hits[:limit]]
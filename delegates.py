@@ -19,8 +19,11 @@ class ButtonDelegate(QStyledItemDelegate):
         model = index.model()
         is_enabled = False
         
+        # Template-generated rows are edited through their template
+        if keybind.is_generated:
+            is_enabled = False
         # Column 2 is "Unbind"
-        if index.column() == 2:
+        elif index.column() == 2:
             is_enabled = keybind.is_bound
         # Column 3 is "Reset"
         elif index.column() == 3:
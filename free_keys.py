@@ -0,0 +1,158 @@
+# free_keys.py
+from collections import defaultdict
+
+from model import normalize_key
+from tree_model import action_family
+
+# Modifier bits of the occupancy mask; meta is tracked but never suggested
+MOD_BITS = {"ctrl": 1, "alt": 2, "shift": 4, "meta": 8}
+ALL_MASKS = 16
+SUGGESTED_MASKS = (0, 4, 1, 2, 5, 6, 3, 7)  # none, shift, ctrl, alt, then pairs, then all three
+
+# Approximate QWERTY positions (column, row) used to rank keys by proximity.
+# Letters and symbols use the scancode names BAR binds them by (sc_a, sc_[); digits stay bare.
+_LAYOUT: dict[str, tuple[float, float]] = {"esc": (0, -1), "sc_`": (0, 0), "tab": (0, 1), "backspace": (13.5, 0),
+                                           "enter": (12.75, 2), "space": (6, 4)}
+for _i in range(1, 13):
+    _LAYOUT[f"f{_i}"] = (_i + (_i - 1) // 4 * 0.5, -1)
+for _col, _ch in enumerate("1234567890-="):
+    _LAYOUT[_ch if _ch.isdigit() else f"sc_{_ch}"] = (_col + 1, 0)
+for _offset, _row, _chars in ((1.5, 1, "qwertyuiop[]\\"), (1.75, 2, "asdfghjkl;'"), (2.25, 3, "zxcvbnm./")):
+    for _col, _ch in enumerate(_chars):
+        _LAYOUT[f"sc_{_ch}"] = (_col + _offset, _row)
+for _col, _name in enumerate(("insert", "home", "pageup")):
+    _LAYOUT[_name] = (15 + _col, 0)
+for _col, _name in enumerate(("delete", "end", "pagedown")):
+    _LAYOUT[_name] = (15 + _col, 1)
+_LAYOUT.update({"up": (16, 3), "left": (15, 4), "down": (16, 4), "right": (17, 4)})
+
+# Keys worth suggesting (',' is the multi-tap separator, so it isn't in the layout)
+CANDIDATE_KEYS = tuple(_LAYOUT)
+# Where to look first when an action has no related binds yet
+_HOME_KEYS = ("sc_q", "sc_w", "sc_e", "sc_r", "sc_a", "sc_s", "sc_d", "sc_f")
+
+
+def canonical_base(base: str) -> str:
+    """One name per physical key: `[` and `sc_[` are both sc_[, `sc_1` is 1."""
+    if len(base) == 1 and not base.isalnum():
+        return f"sc_{base}"
+    if len(base) == 4 and base.startswith("sc_") and base[3].isdigit():
+        return base[3]
+    return base
+
+
+def parse_combo(norm: str) -> tuple[str, int, bool] | None:
+    """(base key, modifier mask, any-mode) for a single normalized combo.
+
+    Multi-tap sequences and Any+<modifier> binds don't occupy a plain combo
+    and yield None.
+    """
+    if not norm or "," in norm:
+        return None
+    parts = norm.split("+")
+    base = canonical_base(parts[-1])
+    mods = parts[:-1]
+    if base in MOD_BITS or base in ("any", "unbound"):
+        return None
+    if "any" in mods:
+        return base, 0, True
+    mask = 0
+    for m in mods:
+        mask |= MOD_BITS.get(m, 0)
+    return base, mask, False
+
+
+def format_combo(base: str, mask: int) -> str:
+    """Render a combo the way the game's files write keys (e.g. Ctrl+Shift+sc_a, Alt+sc_[)."""
+    mods = [name for name, bit in (("Ctrl", 1), ("Shift", 4), ("Alt", 2), ("Meta", 8)) if mask & bit]
+    key = base.upper() if len(base) >= 2 and base[0] == "f" and base[1:].isdigit() else base
+    return "+".join(mods + [key])
+
+
+class KeyOccupancy:
+    """Which base-key x modifier-mask combos are taken, kept up to date per edit.
+
+    Each base key has a 16-bit bitmap (one bit per ctrl/alt/shift/meta mask);
+    an Any+<key> bind sets every bit. Reference counts let binds be added and
+    removed in O(1) without rescanning the model.
+    """
+
+    def __init__(self):
+        self.clear()
+
+    def clear(self):
+        self._counts: dict[tuple[str, int], int] = defaultdict(int)
+        self._any_counts: dict[str, int] = defaultdict(int)
+        self._bits: dict[str, int] = {}
+        # Where each family's binds sit, to rank suggestions by proximity
+        self._family_combos: dict[str, dict[tuple[str, int], int]] = defaultdict(lambda: defaultdict(int))
+
+    def _refresh(self, base: str):
+        if self._any_counts.get(base):
+            self._bits[base] = (1 << ALL_MASKS) - 1
+            return
+        bits = 0
+        for mask in range(ALL_MASKS):
+            if self._counts.get((base, mask)):
+                bits |= 1 << mask
+        if bits:
+            self._bits[base] = bits
+        else:
+            self._bits.pop(base, None)
+
+    def _update(self, key: str | None, action: str | None, delta: int, normalized: bool = False):
+        combo = parse_combo(key if normalized else normalize_key(key))
+        if combo is None:
+            return
+        base, mask, is_any = combo
+        if is_any:
+            self._any_counts[base] += delta
+        else:
+            self._counts[(base, mask)] += delta
+        if action:
+            family = self._family_combos[action_family(action)]
+            family[(base, mask)] += delta
+            if family[(base, mask)] <= 0:
+                del family[(base, mask)]
+        self._refresh(base)
+
+    def add(self, key: str | None, action: str | None = None, count: int = 1, normalized: bool = False):
+        self._update(key, action, count, normalized)
+
+    def remove(self, key: str | None, action: str | None = None):
+        self._update(key, action, -1)
+
+    def bitmap(self, base: str) -> int:
+        return self._bits.get(base, 0)
+
+    def is_free(self, base: str, mask: int) -> bool:
+        return not (self.bitmap(base) >> mask) & 1
+
+    def suggest(self, action: str, limit: int = 10) -> list[str]:
+        """Free combos ranked by closeness to keys bound to related actions."""
+        anchors = list(self._family_combos.get(action_family(action), {}))
+        if not anchors:
+            anchors = [(k, 0) for k in _HOME_KEYS]
+        anchor_points = [(_LAYOUT.get(base), mask) for base, mask in anchors]
+
+        scored = []
+        for base in CANDIDATE_KEYS:
+            bits = self.bitmap(base)
+            pos = _LAYOUT[base]
+            for rank, mask in enumerate(SUGGESTED_MASKS):
+                if (bits >> mask) & 1:
+                    continue
+                best = None
+                for anchor_pos, anchor_mask in anchor_points:
+                    if anchor_pos is None:
+                        continue
+                    dist = abs(pos[0] - anchor_pos[0]) + abs(pos[1] - anchor_pos[1])
+                    # Sharing the related binds' modifiers counts as being close
+                    dist += bin(mask ^ anchor_mask).count("1") * 1.5
+                    if best is None or dist < best:
+                        best = dist
+                if best is None:
+                    best = 100.0
+                scored.append((best, rank, base, mask))
+        scored.sort()
+        return [format_combo(base, mask) for _, _, base, mask in scored[:limit]]
@@ -0,0 +1,246 @@
+# install_locator.py
+import json
+import os
+import string
+import sys
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+
+UIKEYS_NAME = "uikeys.txt"
+# Files that identify a BAR/Spring data directory even before uikeys.txt exists
+DATA_MARKERS = (UIKEYS_NAME, "springsettings.cfg")
+INSTALL_NAMES = ("Beyond-All-Reason", "Beyond All Reason", "BAR")
+_INSTALL_NAMES_LOWER = {n.lower() for n in INSTALL_NAMES}
+
+MAX_DEPTH = 3          # Levels below each root that the walk will descend
+MAX_DIRS_PER_ROOT = 2000
+CACHE_VERSION = 1
+
+
+@dataclass(frozen=True)
+class GameInstall:
+    data_dir: str
+
+    @property
+    def uikeys_path(self) -> str:
+        return os.path.join(self.data_dir, UIKEYS_NAME)
+
+
+def _is_data_dir(path: str) -> bool:
+    return any(os.path.isfile(os.path.join(path, m)) for m in DATA_MARKERS)
+
+
+def _dir_stamp(path: str) -> int | None:
+    try:
+        return os.stat(path).st_mtime_ns
+    except OSError:
+        return None
+
+
+def search_roots() -> list[str]:
+    """Folders that commonly contain (or are) a BAR install, for this platform."""
+    roots: list[str] = []
+    home = os.path.expanduser("~")
+    if sys.platform.startswith("win"):
+        for var in ("ProgramFiles", "ProgramFiles(x86)", "LOCALAPPDATA", "APPDATA", "ProgramW6432"):
+            base = os.environ.get(var)
+            if base:
+                roots.append(base)
+                roots.append(os.path.join(base, "Programs"))
+        # Portable / other-drive installs usually sit at the top of a drive or under Games
+        for letter in string.ascii_uppercase:
+            drive = f"{letter}:\\"
+            if os.path.isdir(drive):
+                roots.append(drive)
+                roots.append(os.path.join(drive, "Games"))
+    else:
+        xdg_state = os.environ.get("XDG_STATE_HOME") or os.path.join(home, ".local", "state")
+        xdg_data = os.environ.get("XDG_DATA_HOME") or os.path.join(home, ".local", "share")
+        roots += [xdg_state, xdg_data, os.path.join(home, "Games"), os.path.join(home, "Applications"), home]
+    roots.append(os.path.join(home, "Documents"))
+    # Keep order, drop duplicates and anything that isn't there
+    seen = set()
+    return [r for r in roots if not (r in seen or seen.add(r)) and os.path.isdir(r)]
+
+
+def launcher_config_dirs() -> list[str]:
+    """Data directories named in the BAR launcher's config files, if any."""
+    configs = []
+    for base in (os.environ.get("APPDATA"), os.environ.get("LOCALAPPDATA"),
+                 os.environ.get("XDG_CONFIG_HOME") or os.path.join(os.path.expanduser("~"), ".config")):
+        if not base:
+            continue
+        for name in INSTALL_NAMES:
+            configs.append(os.path.join(base, name, "config.json"))
+
+    found = []
+    for path in configs:
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            continue
+        stack = [data]
+        while stack:
+            value = stack.pop()
+            if isinstance(value, dict):
+                stack.extend(value.values())
+            elif isinstance(value, list):
+                stack.extend(value)
+            elif isinstance(value, str) and os.path.isabs(value) and os.path.isdir(value):
+                for candidate in (value, os.path.join(value, "data")):
+                    if _is_data_dir(candidate):
+                        found.append(os.path.abspath(candidate))
+    return found
+
+
+def _walk_root(root: str) -> list[str]:
+    """Bounded breadth-first search of one root for BAR data directories."""
+    found = []
+    queue = [(root, 0)]
+    visited = 0
+    while queue and visited < MAX_DIRS_PER_ROOT:
+        next_queue = []
+        for path, depth in queue:
+            visited += 1
+            try:
+                with os.scandir(path) as it:
+                    entries = [e for e in it if e.is_dir(follow_symlinks=False)]
+            except OSError:
+                continue
+            for entry in entries:
+                name = entry.name.lower()
+                looks_like_bar = name in _INSTALL_NAMES_LOWER or name.startswith("beyond")
+                # Windows installs keep a data/ subfolder; Linux uses the BAR folder itself
+                if (name == "data" or looks_like_bar) and _is_data_dir(entry.path):
+                    found.append(os.path.abspath(entry.path))
+                elif depth + 1 < MAX_DEPTH and not name.startswith((".", "$")):
+                    # Below the top level only follow folders that look like a BAR install
+                    if depth == 0 or looks_like_bar:
+                        next_queue.append((entry.path, depth + 1))
+        queue = next_queue
+    return found
+
+
+class InstallLocator:
+    """Finds BAR data directories and remembers them between launches.
+
+    The first run walks the known roots in parallel; afterwards the chosen
+    data directory is trusted as long as its mtime matches the cached stamp,
+    so resolving it costs a single stat.
+
+    Files picked by hand that aren't an install's uikeys.txt (a second
+    profile's keys, a test folder) are kept as profiles: full paths, listed
+    apart from the discovered installs and never mistaken for one.
+    """
+
+    def __init__(self, cache_dir: str):
+        self.cache_path = os.path.join(cache_dir, "installs.json")
+        self._cache = self._read_cache()
+
+    def _read_cache(self) -> dict:
+        try:
+            with open(self.cache_path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            return {}
+        return data if isinstance(data, dict) and data.get("version") == CACHE_VERSION else {}
+
+    def _write_cache(self):
+        self._cache["version"] = CACHE_VERSION
+        tmp = self.cache_path + ".tmp"
+        try:
+            with open(tmp, "w", encoding="utf-8") as f:
+                json.dump(self._cache, f, indent=1)
+            os.replace(tmp, self.cache_path)
+        except OSError:
+            pass  # The cache is only a speed-up
+
+    @property
+    def installs(self) -> list[GameInstall]:
+        return [GameInstall(d) for d in self._cache.get("installs", [])]
+
+    @property
+    def profiles(self) -> list[str]:
+        return list(self._cache.get("profiles", []))
+
+    def resolve_target(self) -> str | None:
+        """The file activation writes to: the chosen profile, else the preferred install's uikeys.txt."""
+        target = self._cache.get("target")
+        if target:
+            return target
+        install = self.resolve()
+        return install.uikeys_path if install else None
+
+    def set_target(self, path: str):
+        """Make `path` the activation target on this and future launches.
+
+        A uikeys.txt inside a BAR data directory selects that install;
+        any other file is remembered as a profile.
+        """
+        path = os.path.abspath(path)
+        data_dir = os.path.dirname(path)
+        known = data_dir in self._cache.get("installs", [])
+        if os.path.basename(path).lower() == UIKEYS_NAME and (known or _is_data_dir(data_dir)):
+            self.set_preferred(GameInstall(data_dir))
+            return
+        profiles = self._cache.setdefault("profiles", [])
+        if path not in profiles:
+            profiles.append(path)
+        self._cache["target"] = path
+        self._write_cache()
+
+    def resolve(self) -> GameInstall | None:
+        """The preferred install, walking the disk only if there is no usable cache.
+
+        An earlier scan that found nothing is remembered too, so machines
+        without BAR don't pay for a walk on every launch; use scan() to retry.
+        """
+        preferred = self._cache.get("preferred")
+        if preferred:
+            stamp = _dir_stamp(preferred)
+            if stamp is not None and stamp == self._cache.get("stamp"):
+                return GameInstall(preferred)
+            if stamp is not None and _is_data_dir(preferred):
+                # Still a data dir, something inside just changed: refresh the stamp
+                self._cache["stamp"] = stamp
+                self._write_cache()
+                return GameInstall(preferred)
+        elif "installs" in self._cache:
+            return None
+        self.scan()
+        preferred = self._cache.get("preferred")
+        return GameInstall(preferred) if preferred else None
+
+    def scan(self, max_workers: int | None = None) -> list[GameInstall]:
+        """Search launcher configs and install roots (in parallel) and cache the result."""
+        found: list[str] = list(launcher_config_dirs())
+        roots = search_roots()
+        if roots:
+            with ThreadPoolExecutor(max_workers=max_workers or min(8, len(roots))) as pool:
+                for dirs in pool.map(_walk_root, roots):
+                    found.extend(dirs)
+        unique, seen = [], set()
+        for d in found:
+            if os.path.normcase(d) not in seen:
+                seen.add(os.path.normcase(d))
+                unique.append(d)
+
+        self._cache["installs"] = unique
+        preferred = self._cache.get("preferred")
+        if not preferred or preferred not in unique:
+            preferred = unique[0] if unique else None
+        self._set_preferred(preferred)
+        return [GameInstall(d) for d in unique]
+
+    def set_preferred(self, install: GameInstall):
+        """Make `install` the activation target on this and future launches."""
+        if install.data_dir not in self._cache.get("installs", []):
+            self._cache.setdefault("installs", []).append(install.data_dir)
+        self._cache["target"] = None  # An install replaces any profile as the target
+        self._set_preferred(install.data_dir)
+
+    def _set_preferred(self, data_dir: str | None):
+        self._cache["preferred"] = data_dir
+        self._cache["stamp"] = _dir_stamp(data_dir) if data_dir else None
+        self._write_cache()
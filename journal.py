@@ -0,0 +1,249 @@
+# journal.py
+import hashlib
+import os
+import pickle
+import threading
+
+from util import bundled_defaults_digest
+
+SNAPSHOT_VERSION = 2
+
+
+def file_digest(path: str | None) -> str | None:
+    """SHA-1 of a file's contents, or None if it can't be read."""
+    if not path:
+        return None
+    digest = hashlib.sha1()
+    try:
+        with open(path, "rb") as f:
+            for chunk in iter(lambda: f.read(1 << 16), b""):
+                digest.update(chunk)
+    except OSError:
+        return None
+    return digest.hexdigest()
+
+
+def source_stamp(path: str | None):
+    """(abspath, content digest) for the edited file, or None if it can't be read.
+
+    Content rather than mtime, so touching or re-syncing an unchanged file
+    doesn't invalidate the session.
+    """
+    digest = file_digest(path)
+    return (os.path.abspath(path), digest) if digest else None
+
+
+def defaults_stamp(path: str | None) -> str | None:
+    """Content digest of the defaults file.
+
+    Frozen builds take it from the resource manifest: onefile builds unpack to
+    a new temp folder on every launch, so the path is never the same twice.
+    """
+    return bundled_defaults_digest(path) or file_digest(path)
+
+
+class EditJournal:
+    """Append-only log of row edits: one `id<TAB>key<TAB>action` line per change.
+
+    Appends are tiny writes to an already-open handle, so they are cheap enough
+    to do on every edit. Later entries for the same row win; once enough
+    superseded entries pile up the file is compacted on a background thread.
+    """
+
+    COMPACT_AFTER = 256
+
+    def __init__(self, path: str):
+        self.path = path
+        self._lock = threading.Lock()
+        self._handle = None
+        self._appends_since_compact = 0
+        self._compactor: threading.Thread | None = None
+        self._generation = 0  # Bumped by clear() so a running compaction backs off
+
+    def _open(self):
+        if self._handle is None:
+            self._handle = open(self.path, "a", encoding="utf-8", newline="\n")
+        return self._handle
+
+    def append(self, kb_id: int, key: str, action: str):
+        with self._lock:
+            f = self._open()
+            f.write(f"{kb_id}\t{key}\t{action}\n")
+            f.flush()  # Reaches the OS immediately, survives the app being killed
+            self._appends_since_compact += 1
+            due = self._appends_since_compact >= self.COMPACT_AFTER
+        if due:
+            self.compact_async()
+
+    def entries(self) -> dict[int, tuple[str, str]]:
+        """Replay the journal: row id -> (key, action), last write wins."""
+        result: dict[int, tuple[str, str]] = {}
+        with self._lock:
+            if self._handle is not None:
+                self._handle.flush()
+            # A compaction interrupted by a crash leaves older entries aside
+            for path in (self._compacting_path, self.path):
+                self._read_into(path, result)
+        return result
+
+    @property
+    def _compacting_path(self) -> str:
+        return self.path + ".compacting"
+
+    @staticmethod
+    def _read_into(path: str, result: dict[int, tuple[str, str]]):
+        try:
+            with open(path, "r", encoding="utf-8", errors="ignore") as f:
+                for line in f:
+                    parts = line.rstrip("\n").split("\t", 2)
+                    # A torn final line (killed mid-write) is simply skipped
+                    if len(parts) != 3 or not parts[0].isdigit():
+                        continue
+                    result[int(parts[0])] = (parts[1], parts[2])
+        except FileNotFoundError:
+            pass
+
+    @staticmethod
+    def _write_entries(f, entries: dict[int, tuple[str, str]]):
+        for kb_id, (key, action) in entries.items():
+            f.write(f"{kb_id}\t{key}\t{action}\n")
+
+    def clear(self):
+        with self._lock:
+            if self._handle is not None:
+                self._handle.close()
+                self._handle = None
+            for path in (self._compacting_path, self.path):
+                try:
+                    os.remove(path)
+                except FileNotFoundError:
+                    pass
+            self._appends_since_compact = 0
+            self._generation += 1
+
+    def compact(self):
+        """Rewrite the journal keeping only the latest entry per row.
+
+        The live file is moved aside so appends continue into a fresh journal
+        while the old one is folded down without holding the lock.
+        """
+        with self._lock:
+            if self._handle is not None:
+                self._handle.close()
+                self._handle = None
+            if not os.path.exists(self._compacting_path):
+                try:
+                    os.replace(self.path, self._compacting_path)
+                except FileNotFoundError:
+                    return
+            self._appends_since_compact = 0
+            generation = self._generation
+
+        folded: dict[int, tuple[str, str]] = {}
+        self._read_into(self._compacting_path, folded)
+
+        with self._lock:
+            if self._handle is not None:
+                self._handle.close()
+                self._handle = None
+            if generation != self._generation:
+                return
+            # Edits made during compaction still win over the folded history
+            self._read_into(self.path, folded)
+            tmp = self.path + ".tmp"
+            with open(tmp, "w", encoding="utf-8", newline="\n") as f:
+                self._write_entries(f, folded)
+            os.replace(tmp, self.path)
+            os.remove(self._compacting_path)
+
+    def compact_async(self) -> threading.Thread:
+        if self._compactor is not None and self._compactor.is_alive():
+            return self._compactor
+        self._compactor = threading.Thread(target=self._compact_quietly, name="journal-compact", daemon=True)
+        self._compactor.start()
+        return self._compactor
+
+    def _compact_quietly(self):
+        try:
+            self.compact()
+        except OSError:
+            # Compaction is an optimisation; the uncompacted journal stays valid
+            pass
+
+    def close(self):
+        with self._lock:
+            if self._handle is not None:
+                self._handle.close()
+                self._handle = None
+
+
+class SessionStore:
+    """Binary snapshot of the parsed model plus the edit journal on top of it.
+
+    The snapshot is only trusted while the keybind and defaults files it was
+    taken from have the same contents; restoring it skips text parsing
+    entirely, and replaying the journal brings back unsaved edits.
+    """
+
+    def __init__(self, directory: str):
+        self.directory = directory
+        self.snapshot_path = os.path.join(directory, "session.snapshot")
+        self.journal = EditJournal(os.path.join(directory, "session.journal"))
+
+    def last_filepath(self) -> str | None:
+        state = self._read_snapshot()
+        return state["source"][0] if state and state.get("source") else None
+
+    def save_snapshot(self, filepath: str, defaults_path: str | None, state: dict):
+        """Checkpoint the parsed model; the journal restarts empty on top of it."""
+        payload = dict(state)
+        payload["version"] = SNAPSHOT_VERSION
+        payload["source"] = source_stamp(filepath)
+        payload["defaults"] = defaults_stamp(defaults_path)
+        tmp = self.snapshot_path + ".tmp"
+        with open(tmp, "wb") as f:
+            pickle.dump(payload, f, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(tmp, self.snapshot_path)
+        self.journal.clear()
+
+    def load_snapshot(self, filepath: str, defaults_path: str | None) -> dict | None:
+        """Return the snapshot for `filepath` if still valid, else None."""
+        state = self._read_snapshot()
+        if not state or state.get("source") is None:
+            return None
+        if tuple(state["source"]) != source_stamp(filepath) or state.get("defaults") != defaults_stamp(defaults_path):
+            return None
+        return state
+
+    def pending_edits(self) -> tuple[str | None, dict[int, tuple[str, str]], list[str] | None]:
+        """(file, unsaved row edits, unsaved template directives or None), for when the snapshot is stale."""
+        state = self._read_snapshot()
+        source = state["source"][0] if state and state.get("source") else None
+        templates = None
+        edits: dict[int, tuple[str, str]] = {}
+        if state and state.get("unsaved"):
+            templates = list(state.get("templates", []))
+            # A template edit checkpoints (and empties the journal), folding earlier
+            # row edits into the snapshot; recover those from rows that differ from the file
+            for kb_id, action, key, original, synthetic in state.get("keybinds", []):
+                unbound = key.strip().lower() in ("", "unbound")
+                if (synthetic and not unbound) or (not synthetic and key != original):
+                    edits[kb_id] = (key, action)
+        edits.update(self.journal.entries())
+        return source, edits, templates
+
+    def _read_snapshot(self) -> dict | None:
+        try:
+            with open(self.snapshot_path, "rb") as f:
+                state = pickle.load(f)
+        except (OSError, pickle.UnpicklingError, EOFError, AttributeError, ValueError):
+            return None
+        if not isinstance(state, dict) or state.get("version") != SNAPSHOT_VERSION:
+            return None
+        return state
+
+    def record_edit(self, kb_id: int, key: str, action: str):
+        self.journal.append(kb_id, key, action)
+
+    def close(self):
+        self.journal.close()
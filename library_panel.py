@@ -0,0 +1,145 @@
+# library_panel.py
+import os
+from concurrent.futures import ThreadPoolExecutor
+from PyQt6.QtWidgets import (
+    QWidget, QVBoxLayout, QHBoxLayout, QPushButton, QLabel, QLineEdit, QComboBox,
+    QTableWidget, QTableWidgetItem, QHeaderView, QFileDialog, QMessageBox
+)
+from PyQt6.QtCore import Qt, pyqtSignal, QTimer
+
+from preset_library import PresetIndex, collect_changes
+
+class PresetLibraryPanel(QWidget):
+    """Browse and query a whole folder of presets through the SQLite index."""
+
+    preset_chosen = pyqtSignal(str)
+
+    MODES = ["Key", "Action contains", "Action exact"]
+
+    def __init__(self, index: PresetIndex, parent=None):
+        super().__init__(parent)
+        self.index = index
+        # Scans walk and parse on a background thread (which fans out to processes);
+        # only the SQLite reads and writes stay on this thread
+        self._scanner = ThreadPoolExecutor(max_workers=1, thread_name_prefix="preset-scan")
+        self._scan_future = None
+        self._scan_timer = QTimer(self)
+        self._scan_timer.setInterval(100)
+        self._scan_timer.timeout.connect(self._check_scan)
+
+        self.folder_label = QLabel()
+        self.folder_label.setWordWrap(True)
+        self.choose_button = QPushButton("Folder…")
+        self.rescan_button = QPushButton("Rescan")
+        self.mode_combo = QComboBox()
+        self.mode_combo.addItems(self.MODES)
+        self.query_edit = QLineEdit()
+        self.query_edit.setPlaceholderText("e.g. Ctrl+sc_a or selectbox_idle")
+        self.status_label = QLabel()
+        self.status_label.setStyleSheet("color: #888;")
+
+        self.results = QTableWidget(0, 3)
+        self.results.setHorizontalHeaderLabels(["Preset", "Key", "Action"])
+        self.results.setEditTriggers(QTableWidget.EditTrigger.NoEditTriggers)
+        self.results.setSelectionBehavior(QTableWidget.SelectionBehavior.SelectRows)
+        self.results.verticalHeader().setVisible(False)
+        header = self.results.horizontalHeader()
+        header.setSectionResizeMode(0, QHeaderView.ResizeMode.ResizeToContents)
+        header.setSectionResizeMode(1, QHeaderView.ResizeMode.ResizeToContents)
+        header.setSectionResizeMode(2, QHeaderView.ResizeMode.Stretch)
+
+        top = QHBoxLayout()
+        top.addWidget(self.folder_label, 1)
+        top.addWidget(self.choose_button)
+        top.addWidget(self.rescan_button)
+        query = QHBoxLayout()
+        query.addWidget(self.mode_combo)
+        query.addWidget(self.query_edit, 1)
+
+        layout = QVBoxLayout(self)
+        layout.addLayout(top)
+        layout.addLayout(query)
+        layout.addWidget(self.results)
+        layout.addWidget(self.status_label)
+
+        self.choose_button.clicked.connect(self.choose_folder)
+        self.rescan_button.clicked.connect(self.rescan)
+        self.query_edit.textChanged.connect(self.run_query)
+        self.mode_combo.currentTextChanged.connect(self.run_query)
+        self.results.cellDoubleClicked.connect(self.on_result_double_clicked)
+
+        self._update_folder_label()
+
+    def _update_folder_label(self):
+        folder = self.index.get_folder()
+        self.folder_label.setText(f"Library: {folder}" if folder else "Library: (no folder chosen)")
+        self.rescan_button.setEnabled(bool(folder) and self._scan_future is None)
+
+    def choose_folder(self):
+        start = self.index.get_folder() or os.path.expanduser("~")
+        folder = QFileDialog.getExistingDirectory(self, "Choose Preset Folder", start)
+        if folder:
+            self.index.set_folder(folder)
+            self._update_folder_label()
+            self.rescan()
+
+    def rescan(self):
+        folder = self.index.get_folder()
+        if not folder or self._scan_future is not None:
+            return
+        self._scan_future = self._scanner.submit(collect_changes, folder, self.index.known_files())
+        self.choose_button.setEnabled(False)
+        self.rescan_button.setEnabled(False)
+        self.status_label.setText("Scanning presets…")
+        self._scan_timer.start()
+
+    def _check_scan(self):
+        future = self._scan_future
+        if future is None or not future.done():
+            return
+        self._scan_timer.stop()
+        self._scan_future = None
+        self.choose_button.setEnabled(True)
+        self._update_folder_label()
+        try:
+            stats = self.index.apply_scan(future.result())
+        except Exception as e:
+            QMessageBox.critical(self, "Library Error", f"Failed to scan presets: {e}")
+            return
+        self.status_label.setText(
+            f"{self.index.file_count()} presets indexed "
+            f"({stats['parsed']} parsed, {stats['removed']} removed, {stats['unchanged']} unchanged)"
+        )
+        self.run_query()
+
+    def shutdown(self):
+        """Stop polling and drop queued scans (a running one finishes in the background)."""
+        self._scan_timer.stop()
+        self._scanner.shutdown(wait=False, cancel_futures=True)
+
+    def run_query(self, *_):
+        text = self.query_edit.text()
+        mode = self.mode_combo.currentText()
+        if mode == "Key":
+            rows = self.index.find_by_key(text)
+        else:
+            rows = self.index.find_by_action(text, exact=(mode == "Action exact"))
+
+        folder = self.index.get_folder() or ""
+        self.results.setRowCount(len(rows))
+        for r, (path, key, action) in enumerate(rows):
+            shown = os.path.relpath(path, folder) if folder and path.startswith(folder) else path
+            item = QTableWidgetItem(shown)
+            item.setData(Qt.ItemDataRole.UserRole, path)
+            item.setToolTip(path)
+            self.results.setItem(r, 0, item)
+            self.results.setItem(r, 1, QTableWidgetItem(key))
+            self.results.setItem(r, 2, QTableWidgetItem(action))
+        if text.strip():
+            presets = len({row[0] for row in rows})
+            self.status_label.setText(f"{len(rows)} binds in {presets} presets")
+
+    def on_result_double_clicked(self, row, _column):
+        item = self.results.item(row, 0)
+        if item:
+            self.preset_chosen.emit(item.data(Qt.ItemDataRole.UserRole))
@@ -1,12 +1,15 @@
 # main.py
-import os
 import sys
+import multiprocessing
 from PyQt6.QtWidgets import QApplication
 from PyQt6.QtGui import QIcon
 from main_window import MainWindow
-from util import resource_path
+from util import find_resource
 
 if __name__ == "__main__":
+    # Frozen builds re-launch this executable for process-pool workers (preset migration)
+    multiprocessing.freeze_support()
+
     # On Windows, set an explicit AppUserModelID so the taskbar uses our icon
     if sys.platform.startswith("win"):
         try:
@@ -17,13 +20,7 @@ if __name__ == "__main__":
 
     app = QApplication(sys.argv)
     
-    base_dir = os.path.dirname(os.path.abspath(__file__))
-    icon_path = None
-    for rel in ("assets/icon.ico", "icon.ico", "assets/icon.png", "icon.png"):
-        p = resource_path(rel)
-        if os.path.exists(p):
-            icon_path = p
-            break
+    icon_path = find_resource("assets/icon.ico", "icon.ico", "assets/icon.png", "icon.png")
     if icon_path:
         app.setWindowIcon(QIcon(icon_path))
     
@@ -4,7 +4,8 @@ import sys
 import shutil
 from PyQt6.QtWidgets import (
     QMainWindow, QWidget, QVBoxLayout, QHBoxLayout, QPushButton, QCheckBox,
-    QComboBox, QTableView, QHeaderView, QFileDialog, QMessageBox, QLabel
+    QComboBox, QTableView, QHeaderView, QFileDialog, QMessageBox, QLabel, QDockWidget, QApplication,
+    QInputDialog, QTreeView, QMenu
 )
 from PyQt6.QtCore import QSortFilterProxyModel, Qt, QModelIndex
 from PyQt6.QtGui import QCursor
@@ -12,26 +13,41 @@ from PyQt6.QtGui import QCursor
 from model import KeybindTableModel
 from delegates import ButtonDelegate
 from key_capture import KeyCaptureDialog
-from util import resource_path
+from journal import SessionStore
+from preset_library import PresetIndex
+from library_panel import PresetLibraryPanel
+from migration import migrate_presets
+from templates import BindTemplate, TemplateError
+from tree_model import KeybindTreeModel
+from free_keys import KeyOccupancy
+from install_locator import InstallLocator
+from util import resource_path, find_resource, app_data_dir
 
 class KeybindSortFilterProxyModel(QSortFilterProxyModel):
     def __init__(self, parent=None):
         super().__init__(parent)
         self._show_unbound_only = False
         self._show_changed_only = False
+        self._show_unknown_only = False
 
-    def set_filters(self, show_unbound, show_changed):
+    def set_filters(self, show_unbound, show_changed, show_unknown=False):
         self._show_unbound_only = show_unbound
         self._show_changed_only = show_changed
+        self._show_unknown_only = show_unknown
         self.invalidateFilter()
 
     def filterAcceptsRow(self, source_row, source_parent):
         model = self.sourceModel()
         index = model.index(source_row, 0, source_parent)
-        keybind = model.data(index, Qt.ItemDataRole.UserRole)
+        return self.accepts_keybind(model.data(index, Qt.ItemDataRole.UserRole))
 
+    def accepts_keybind(self, keybind) -> bool:
+        # Shared with the grouped tree view, which filters lazily per group
+        model = self.sourceModel()
         if self._show_unbound_only and keybind.is_bound:
             return False
+        if self._show_unknown_only and not model.is_unknown_action(keybind.action):
+            return False
         if self._show_changed_only:
             # Prefer default-aware change detection
             has_defaults = bool(model.get_default_key(keybind.action))
@@ -44,6 +60,9 @@ class KeybindSortFilterProxyModel(QSortFilterProxyModel):
         
         return True
 
+# Used when no install can be found (and none has been picked yet)
+FALLBACK_GAME_FILE = r"C:\\Program Files\\Beyond-All-Reason\\data\\uikeys.txt"
+
 class MainWindow(QMainWindow):
     def __init__(self):
         super().__init__()
@@ -51,15 +70,26 @@ class MainWindow(QMainWindow):
         self.setGeometry(100, 100, 1000, 720)
 
         # --- File Paths ---
-        self.filename = r"C:\\Program Files\\Beyond-All-Reason\\data\\uikeys.txt"
-        self.game_file_path = self.filename  # Game-recognized path for activation
+        # Game-recognized path for activation: cached after the first search
+        try:
+            self.locator = InstallLocator(app_data_dir("locator"))
+            target = self.locator.resolve_target()
+        except OSError:
+            self.locator, target = None, None
+        self.game_file_path = target or FALLBACK_GAME_FILE
+        self.filename = self.game_file_path
+        # Autosave: snapshot + edit journal so a killed session can be restored
+        try:
+            self.session = SessionStore(app_data_dir("session"))
+        except OSError:
+            self.session = None
+        last = self.session.last_filepath() if self.session else None
+        if last and os.path.exists(last):
+            self.filename = last
         # Look for defaults in root or in a 'defaults' folder (onedir build)
-        candidate = resource_path("default keys.txt")
-        if not os.path.exists(candidate):
-            alt = resource_path("defaults", "default keys.txt")
-            self.defaults_path = alt if os.path.exists(alt) else candidate
-        else:
-            self.defaults_path = candidate
+        self.defaults_path = (
+            find_resource("default keys.txt", "defaults/default keys.txt") or resource_path("default keys.txt")
+        )
 
         # --- UI Setup ---
         central_widget = QWidget()
@@ -70,12 +100,25 @@ class MainWindow(QMainWindow):
         top_bar_layout = QHBoxLayout()
         self.file_label = QLabel(f"Editing: {self.filename}")
         self.open_button = QPushButton("Open…")
+        self.library_button = QPushButton("Library…")
+        self.library_button.setToolTip("Search a whole folder of presets by key or action")
+        self.templates_button = QPushButton("Templates…")
+        self.templates_button.setToolTip("Define bind families that expand into many binds")
+        self.migrate_button = QPushButton("Migrate…")
+        self.migrate_button.setToolTip("Update presets after a game patch changed the default keys")
         self.load_button = QPushButton("Reload")
         self.save_button = QPushButton("Save Changes")
         self.activate_button = QPushButton("Activate to Game")
         self.activate_button.setToolTip(f"Write current keybinds to: {self.game_file_path}")
+        self.target_combo = QComboBox()
+        self.target_combo.setToolTip("Game install that 'Activate to Game' writes to")
+        self.refresh_targets()
         self.unbound_check = QCheckBox("Show unbound only")
         self.changed_check = QCheckBox("Show changed only")
+        self.unknown_check = QCheckBox("Show unknown only")
+        self.unknown_check.setToolTip("Actions not found in default keys.txt (likely typos)")
+        self.group_check = QCheckBox("Group by family")
+        self.group_check.setToolTip("Show actions grouped by command family (select*, edit_*, chat*, …)")
         self.sort_combo = QComboBox()
         self.sort_combo.addItems(["Original", "Action A→Z", "Unbound first"])
 
@@ -84,10 +127,16 @@ class MainWindow(QMainWindow):
         top_bar_layout.addWidget(self.sort_combo)
         top_bar_layout.addWidget(self.unbound_check)
         top_bar_layout.addWidget(self.changed_check)
+        top_bar_layout.addWidget(self.unknown_check)
+        top_bar_layout.addWidget(self.group_check)
         top_bar_layout.addWidget(self.open_button)
+        top_bar_layout.addWidget(self.library_button)
+        top_bar_layout.addWidget(self.templates_button)
+        top_bar_layout.addWidget(self.migrate_button)
         top_bar_layout.addWidget(self.load_button)
         top_bar_layout.addWidget(self.save_button)
         top_bar_layout.addWidget(self.activate_button)
+        top_bar_layout.addWidget(self.target_combo)
         main_layout.addLayout(top_bar_layout)
 
         # Subtle UI hint beneath controls
@@ -107,8 +156,15 @@ class MainWindow(QMainWindow):
         self.table_view.entered.connect(self.on_table_cell_entered)
         self.table_view.viewportEntered.connect(lambda: self.table_view.viewport().unsetCursor())
 
+        # Grouped tree view; its model is only built the first time it is shown
+        self.tree_view = None
+        self.tree_model = None
+
         # --- Model and View Connection ---
         self.model = KeybindTableModel()
+        if self.session:
+            self.model.attach_session(self.session)
+        self.model.attach_occupancy(KeyOccupancy())
         self.proxy_model = KeybindSortFilterProxyModel()
         self.proxy_model.setSourceModel(self.model)
         
@@ -129,19 +185,27 @@ class MainWindow(QMainWindow):
         header.setSectionResizeMode(3, QHeaderView.ResizeMode.ResizeToContents)
         self.table_view.verticalHeader().setVisible(False)
         self.table_view.setAlternatingRowColors(True)
+        self.table_view.setContextMenuPolicy(Qt.ContextMenuPolicy.CustomContextMenu)
+        self.table_view.customContextMenuRequested.connect(self.on_table_context_menu)
 
         # --- Connect Signals and Slots ---
         self.open_button.clicked.connect(self.open_keybinds)
-        self.load_button.clicked.connect(self.load_keybinds)
+        self.library_button.clicked.connect(self.toggle_library)
+        self.templates_button.clicked.connect(self.edit_templates)
+        self.migrate_button.clicked.connect(self.migrate_presets)
+        self.load_button.clicked.connect(self.reload_keybinds)
         self.save_button.clicked.connect(self.save_keybinds)
         self.unbound_check.stateChanged.connect(self.apply_filters)
         self.changed_check.stateChanged.connect(self.apply_filters)
+        self.unknown_check.stateChanged.connect(self.apply_filters)
+        self.group_check.toggled.connect(self.set_grouped_view)
         self.sort_combo.currentTextChanged.connect(self.apply_sort)
         self.table_view.doubleClicked.connect(self.on_table_double_clicked)
         self.activate_button.clicked.connect(self.activate_preset)
+        self.target_combo.activated.connect(self.on_target_chosen)
 
         # --- Initial Load ---
-        self.load_keybinds()
+        self.restore_last_session()
 
     def on_table_cell_entered(self, proxy_index: QModelIndex):
         try:
@@ -163,7 +227,7 @@ class MainWindow(QMainWindow):
             )
             if not path:
                 QMessageBox.critical(self, "Error", "No keybind file selected. Application cannot proceed.")
-                return
+                return False
             self.filename = path
             self.file_label.setText(f"Editing: {self.filename}")
 
@@ -172,6 +236,100 @@ class MainWindow(QMainWindow):
             self.apply_sort(self.sort_combo.currentText()) # Apply initial sort
         except Exception as e:
             QMessageBox.critical(self, "Load Error", f"Failed to load file: {e}")
+            return False
+        self.show_load_warnings()
+        return True
+
+    def show_load_warnings(self):
+        warnings = self.model.load_warnings
+        if warnings:
+            box = QMessageBox(self)
+            box.setIcon(QMessageBox.Icon.Warning)
+            box.setWindowTitle("Load Warnings")
+            box.setText(f"{len(warnings)} problem(s) found while reading:\n{self.filename}")
+            box.setDetailedText("\n".join(warnings))
+            box.exec()
+
+    def reload_keybinds(self):
+        if self.confirm_discard_edits():
+            self.load_keybinds()
+
+    def confirm_discard_edits(self) -> bool:
+        """Ask before an action that would throw away unsaved edits; True to go ahead."""
+        if not self.model.has_unsaved_edits():
+            return True
+        answer = QMessageBox.question(
+            self,
+            "Discard Changes?",
+            f"You have unsaved changes to:\n{self.filename}\n\nDiscard them?",
+            QMessageBox.StandardButton.Yes | QMessageBox.StandardButton.No,
+            QMessageBox.StandardButton.No,
+        )
+        return answer == QMessageBox.StandardButton.Yes
+
+    def restore_last_session(self):
+        # Resume the previous session (with unsaved edits) if its files are unchanged
+        if os.path.exists(self.filename) and self.model.restore_session(self.filename, self.defaults_path):
+            self.apply_sort(self.sort_combo.currentText())
+            return
+
+        # Loading checkpoints the session and empties the journal, so decide about leftover edits first
+        source, edits, templates = self.session.pending_edits() if self.session else (None, {}, None)
+        parts = []
+        if edits:
+            parts.append(f"{len(edits)} unsaved edit(s)")
+        if templates is not None:
+            parts.append("unsaved template changes")
+        pending = " and ".join(parts)
+        reapply = False
+        same_file = source and os.path.normcase(source) == os.path.normcase(os.path.abspath(self.filename))
+        if pending and same_file and os.path.exists(self.filename):
+            answer = QMessageBox.question(
+                self,
+                "Unsaved Edits Found",
+                f"{pending[0].upper()}{pending[1:]} from your last session were found, but this file "
+                f"(or the default keys) changed since:\n{self.filename}\n\n"
+                "Reapply them to the file as it is now? Choosing No discards them.",
+                QMessageBox.StandardButton.Yes | QMessageBox.StandardButton.No,
+                QMessageBox.StandardButton.Yes,
+            )
+            reapply = answer == QMessageBox.StandardButton.Yes
+        elif pending:
+            QMessageBox.warning(
+                self,
+                "Unsaved Edits Lost",
+                f"{pending[0].upper()}{pending[1:]} from your last session belong to a file that "
+                f"can no longer be opened:\n{source or '(unknown file)'}\n\nThey will be discarded.",
+            )
+
+        if not (self.load_keybinds() and reapply):
+            return
+        if templates is not None:
+            parsed = []
+            for directive in templates:
+                try:
+                    parsed.append(BindTemplate.parse(directive))
+                except TemplateError:
+                    continue
+            if parsed != self.model.templates:
+                self.model.set_templates(parsed)
+        if edits:
+            applied = self.model.apply_edits(edits)
+            if applied < len(edits):
+                QMessageBox.information(
+                    self,
+                    "Unsaved Edits",
+                    f"Reapplied {applied} of {len(edits)} edit(s); the rest no longer match a bind in the file.",
+                )
+
+    def closeEvent(self, event):
+        if self.session:
+            self.session.close()
+        if getattr(self, "library_dock", None) is not None:
+            self.library_dock.widget().shutdown()
+        if getattr(self, "library_index", None) is not None:
+            self.library_index.close()
+        super().closeEvent(event)
 
     def open_keybinds(self):
         start_dir = os.path.dirname(self.filename) if os.path.exists(self.filename) else os.path.expanduser("~")
@@ -182,13 +340,99 @@ class MainWindow(QMainWindow):
             "Text files (*.txt);;All files (*.*)"
         )
         if path:
-            self.filename = path
-            self.file_label.setText(f"Editing: {self.filename}")
+            self.open_path(path)
+
+    def open_path(self, path: str):
+        if not self.confirm_discard_edits():
+            return
+        self.filename = path
+        self.file_label.setText(f"Editing: {self.filename}")
+        try:
+            self.model.load_from_file(self.filename, self.defaults_path)
+            self.apply_sort(self.sort_combo.currentText())
+        except Exception as e:
+            QMessageBox.critical(self, "Load Error", f"Failed to load file: {e}")
+            return
+        self.show_load_warnings()
+
+    def toggle_library(self):
+        # Built on first use so startup never touches the index
+        if getattr(self, "library_dock", None) is None:
             try:
-                self.model.load_from_file(self.filename, self.defaults_path)
-                self.apply_sort(self.sort_combo.currentText())
+                self.library_index = PresetIndex(os.path.join(app_data_dir("library"), "index.sqlite3"))
             except Exception as e:
-                QMessageBox.critical(self, "Load Error", f"Failed to load file: {e}")
+                QMessageBox.critical(self, "Library Error", f"Failed to open preset index: {e}")
+                return
+            panel = PresetLibraryPanel(self.library_index, self)
+            panel.preset_chosen.connect(self.open_path)
+            self.library_dock = QDockWidget("Preset Library", self)
+            self.library_dock.setWidget(panel)
+            self.addDockWidget(Qt.DockWidgetArea.RightDockWidgetArea, self.library_dock)
+            if self.library_index.get_folder():
+                panel.rescan()
+            return
+        self.library_dock.setVisible(not self.library_dock.isVisible())
+
+    def migrate_presets(self):
+        old_defaults, _ = QFileDialog.getOpenFileName(
+            self,
+            "Select the PREVIOUS default keys.txt (before the patch)",
+            os.path.dirname(self.filename) if self.filename else os.path.expanduser("~"),
+            "Text files (*.txt);;All files (*.*)"
+        )
+        if not old_defaults:
+            return
+        presets, _ = QFileDialog.getOpenFileNames(
+            self,
+            "Select presets to migrate",
+            os.path.dirname(self.filename) if self.filename else os.path.expanduser("~"),
+            "Text files (*.txt);;All files (*.*)"
+        )
+        if not presets:
+            return
+
+        # Migrating the open file means reloading it afterwards, which would discard unsaved edits
+        current = os.path.abspath(self.filename)
+        if any(os.path.abspath(p) == current for p in presets) and self.model.has_unsaved_edits():
+            answer = QMessageBox.question(
+                self,
+                "Unsaved Changes",
+                f"The open file has unsaved changes:\n{self.filename}\n\n"
+                "Migrate it anyway? It will be reloaded and your unsaved changes discarded. "
+                "Choose No to leave it out of this migration.",
+                QMessageBox.StandardButton.Yes | QMessageBox.StandardButton.No,
+                QMessageBox.StandardButton.No,
+            )
+            if answer != QMessageBox.StandardButton.Yes:
+                presets = [p for p in presets if os.path.abspath(p) != current]
+                if not presets:
+                    return
+
+        QApplication.setOverrideCursor(Qt.CursorShape.WaitCursor)
+        try:
+            diff, reports = migrate_presets(old_defaults, self.defaults_path, presets)
+        except Exception as e:
+            QMessageBox.critical(self, "Migration Error", f"Failed to migrate presets: {e}")
+            return
+        finally:
+            QApplication.restoreOverrideCursor()
+
+        written = sum(1 for r in reports if r.written)
+        failed = sum(1 for r in reports if r.error)
+        manual = sum(1 for r in reports if r.templates)
+        box = QMessageBox(self)
+        box.setWindowTitle("Migration Complete")
+        box.setText(
+            f"Defaults: {len(diff.added)} new, {len(diff.removed)} removed, {len(diff.renamed)} renamed actions.\n"
+            f"Updated {written} of {len(reports)} presets" + (f", {failed} failed." if failed else ".")
+            + (f"\n{manual} presets have templates that use changed actions; edit those by hand." if manual else "")
+        )
+        box.setDetailedText("\n".join(r.summary() for r in reports))
+        box.exec()
+
+        # The open preset may have been rewritten underneath us (only if the user agreed above)
+        if any(r.written and os.path.abspath(r.path) == current for r in reports):
+            self.load_keybinds()
 
     def save_keybinds(self):
         try:
@@ -207,15 +451,97 @@ class MainWindow(QMainWindow):
     def apply_filters(self):
         self.proxy_model.set_filters(
             self.unbound_check.isChecked(),
-            self.changed_check.isChecked()
+            self.changed_check.isChecked(),
+            self.unknown_check.isChecked()
+        )
+        if self.tree_model is not None:
+            self._apply_tree_filter()
+
+    def _apply_tree_filter(self):
+        active = self.unbound_check.isChecked() or self.changed_check.isChecked() or self.unknown_check.isChecked()
+        self.tree_model.set_filter(self.proxy_model.accepts_keybind if active else None)
+
+    def set_grouped_view(self, grouped: bool):
+        if grouped and self.tree_view is None:
+            self.tree_model = KeybindTreeModel(self.model, self)
+            self.tree_view = QTreeView()
+            self.tree_view.setModel(self.tree_model)
+            self.tree_view.setUniformRowHeights(True)
+            self.tree_view.setAlternatingRowColors(True)
+            self.tree_view.header().setSectionResizeMode(0, QHeaderView.ResizeMode.Stretch)
+            self.tree_view.header().setSectionResizeMode(1, QHeaderView.ResizeMode.ResizeToContents)
+            self.tree_view.setContextMenuPolicy(Qt.ContextMenuPolicy.CustomContextMenu)
+            self.tree_view.customContextMenuRequested.connect(self.on_tree_context_menu)
+            self.tree_view.doubleClicked.connect(self.on_tree_double_clicked)
+            self.centralWidget().layout().insertWidget(
+                self.centralWidget().layout().indexOf(self.table_view), self.tree_view
+            )
+            self._apply_tree_filter()
+        if self.tree_view is not None:
+            self.tree_view.setVisible(grouped)
+        self.table_view.setVisible(not grouped)
+
+    def on_table_context_menu(self, pos):
+        proxy_index = self.table_view.indexAt(pos)
+        if not proxy_index.isValid():
+            return
+        source_row = self.proxy_model.mapToSource(proxy_index).row()
+        self.show_free_key_menu(source_row, self.table_view.viewport().mapToGlobal(pos))
+
+    def show_free_key_menu(self, source_row: int, global_pos):
+        keybind = self.model.keybind_at(source_row)
+        if keybind.is_generated:
+            return
+        menu = QMenu(self)
+        header = menu.addAction(f"Free keys for {keybind.action}:")
+        header.setEnabled(False)
+        suggestions = self.model.suggest_free_keys(source_row)
+        if not suggestions:
+            menu.addAction("(no free keys found)").setEnabled(False)
+        for key in suggestions:
+            action = menu.addAction(key)
+            action.setData(key)
+        chosen = menu.exec(global_pos)
+        if chosen is not None and chosen.data():
+            self.model.setData(self.model.index(source_row, 1), chosen.data(), Qt.ItemDataRole.EditRole)
+
+    def on_tree_context_menu(self, pos):
+        index = self.tree_view.indexAt(pos)
+        if index.isValid() and not self.tree_model.is_group(index):
+            source_row = self.tree_model.mapToSource(index).row()
+            self.show_free_key_menu(source_row, self.tree_view.viewport().mapToGlobal(pos))
+            return
+        if not self.tree_model.is_group(index):
+            return
+        group_index = self.tree_model.index(index.row(), 0)
+        menu = QMenu(self)
+        unbind_action = menu.addAction("Unbind all in group")
+        reset_action = menu.addAction("Reset all in group")
+        chosen = menu.exec(self.tree_view.viewport().mapToGlobal(pos))
+        if chosen is unbind_action:
+            self.model.unbind_rows(self.tree_model.group_source_rows(group_index))
+        elif chosen is reset_action:
+            self.model.reset_rows(self.tree_model.group_source_rows(group_index))
+
+    def on_tree_double_clicked(self, index: QModelIndex):
+        if index.column() != 1 or self.tree_model.is_group(index):
+            return
+        source_index = self.tree_model.mapToSource(index)
+        keybind = self.model.data(source_index, Qt.ItemDataRole.UserRole)
+        if keybind is None or keybind.is_generated:
+            return
+        capture_dialog = KeyCaptureDialog(self)
+        capture_dialog.key_sequence_captured.connect(
+            lambda seq: self.model.setData(source_index, seq, Qt.ItemDataRole.EditRole)
         )
+        capture_dialog.exec()
 
     def apply_sort(self, sort_mode):
         self.proxy_model.sort(-1) # Disable default sorting before applying custom
         if sort_mode == "Original":
-            # This is tricky. We sort by the original ID stored in the Keybind object.
-            # A more robust proxy model would handle this. For now, we reload.
-            self.model.load_from_file(self.filename, self.defaults_path)
+            # Sort by the original ID stored in the Keybind object; reloading
+            # here would throw away edits (and a just-restored session).
+            self.model.sort_by_original_order()
         elif sort_mode == "Action A→Z":
             self.table_view.sortByColumn(0, Qt.SortOrder.AscendingOrder)
         elif sort_mode == "Unbound first":
@@ -225,8 +551,34 @@ class MainWindow(QMainWindow):
             self.model._keybinds.sort(key=lambda kb: (not kb.is_bound, kb.action.lower()), reverse=True)
             self.model.endResetModel()
 
+    def edit_templates(self):
+        current = "\n".join(t.directive for t in self.model.templates)
+        text, ok = QInputDialog.getMultiLineText(
+            self,
+            "Bind Templates",
+            "One template per line: <key pattern> <action pattern> | var=values | ...\n"
+            "e.g. //@template Alt+{n} add_to_autogroup {n} | n=0..9",
+            current,
+        )
+        if not ok:
+            return
+        templates = []
+        for line in text.splitlines():
+            if not line.strip():
+                continue
+            try:
+                templates.append(BindTemplate.parse(line))
+            except TemplateError as e:
+                QMessageBox.warning(self, "Template Error", f"{line.strip()}\n\n{e}")
+                return
+        self.model.set_templates(templates)
+
     def on_table_double_clicked(self, proxy_index: QModelIndex):
         if proxy_index.column() == 1: # Key column
+            keybind = self.proxy_model.data(proxy_index, Qt.ItemDataRole.UserRole)
+            if keybind is not None and keybind.is_generated:
+                QMessageBox.information(self, "Generated Bind", "This bind comes from a template. Use 'Templates…' to change it.")
+                return
             capture_dialog = KeyCaptureDialog(self)
             capture_dialog.key_sequence_captured.connect(
                 lambda seq: self.update_keybind(proxy_index, seq)
@@ -238,6 +590,58 @@ class MainWindow(QMainWindow):
         # The key sequence from the dialog is already a string.
         self.model.setData(source_index, new_sequence_str, Qt.ItemDataRole.EditRole)
 
+    def refresh_targets(self):
+        self.target_combo.blockSignals(True)
+        self.target_combo.clear()
+        installs = self.locator.installs if self.locator else []
+        profiles = self.locator.profiles if self.locator else []
+        for install in installs:
+            self.target_combo.addItem(install.uikeys_path, install.uikeys_path)
+        for profile in profiles:
+            self.target_combo.addItem(f"{profile} (profile)", profile)
+        if self.target_combo.findData(self.game_file_path) < 0:
+            self.target_combo.addItem(self.game_file_path, self.game_file_path)
+        self.target_combo.addItem("Rescan installs…", "rescan")
+        self.target_combo.addItem("Other…", "other")
+        self.target_combo.setCurrentIndex(max(0, self.target_combo.findData(self.game_file_path)))
+        self.target_combo.blockSignals(False)
+
+    def set_game_target(self, path: str):
+        if self.locator:
+            # The locator decides whether this is an install's uikeys.txt or a profile
+            self.locator.set_target(path)
+            path = self.locator.resolve_target() or path
+        self.game_file_path = path
+        self.activate_button.setToolTip(f"Write current keybinds to: {self.game_file_path}")
+        self.refresh_targets()
+
+    def on_target_chosen(self, index: int):
+        choice = self.target_combo.itemData(index)
+        if choice == "rescan":
+            if self.locator:
+                QApplication.setOverrideCursor(Qt.CursorShape.WaitCursor)
+                try:
+                    self.locator.scan()
+                finally:
+                    QApplication.restoreOverrideCursor()
+                # A chosen profile stays the target; otherwise follow the preferred install
+                self.game_file_path = self.locator.resolve_target() or self.game_file_path
+                self.activate_button.setToolTip(f"Write current keybinds to: {self.game_file_path}")
+            self.refresh_targets()
+        elif choice == "other":
+            dest, _ = QFileDialog.getSaveFileName(
+                self,
+                "Select game uikeys.txt",
+                self.game_file_path,
+                "Text files (*.txt);;All files (*.*)"
+            )
+            if dest:
+                self.set_game_target(dest)
+            else:
+                self.refresh_targets()
+        elif choice:
+            self.set_game_target(choice)
+
     def activate_preset(self):
         # Ensure we have a valid destination; if not, let the user choose uikeys.txt
         dest = self.game_file_path
@@ -251,8 +655,7 @@ class MainWindow(QMainWindow):
             )
             if not dest:
                 return
-            self.game_file_path = dest
-            self.activate_button.setToolTip(f"Write current keybinds to: {self.game_file_path}")
+            self.set_game_target(dest)
 
         # Try backing up existing game file
         try:
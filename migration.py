@@ -0,0 +1,250 @@
+# migration.py
+"""Migrate presets after a game patch changes `default keys.txt`.
+
+The old and new defaults are diffed once; the resulting plan is then applied
+to each preset in a separate process. Usable from the UI or on its own:
+
+    python migration.py "old default keys.txt" "default keys.txt" preset1.txt preset2.txt ...
+"""
+import os
+import shutil
+import sys
+import tempfile
+from collections import defaultdict
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass, field
+
+from model import parse_line, normalize_key
+from templates import BindTemplate, TemplateError, TEMPLATE_PREFIX
+
+
+@dataclass
+class DefaultsDiff:
+    added: dict[str, list[str]]           # new action -> its default keys
+    removed: set[str]
+    renamed: dict[str, str]               # old action -> new action
+
+    @property
+    def is_empty(self) -> bool:
+        return not (self.added or self.removed or self.renamed)
+
+
+@dataclass
+class MigrationReport:
+    path: str
+    added: list[str] = field(default_factory=list)
+    dropped: list[str] = field(default_factory=list)
+    renamed: list[tuple[str, str]] = field(default_factory=list)
+    new_conflicts: list[str] = field(default_factory=list)
+    templates: list[str] = field(default_factory=list)  # Directives left as-is that use changed actions
+    written: bool = False
+    error: str | None = None
+
+    def summary(self) -> str:
+        name = os.path.basename(self.path)
+        if self.error:
+            return f"{name}: FAILED ({self.error})"
+        parts = [f"+{len(self.added)} new", f"-{len(self.dropped)} dropped"]
+        if self.renamed:
+            parts.append(f"{len(self.renamed)} renamed")
+        if self.new_conflicts:
+            parts.append(f"{len(self.new_conflicts)} new conflicts: {', '.join(self.new_conflicts)}")
+        if self.templates:
+            parts.append(f"{len(self.templates)} templates need a manual update: {'; '.join(self.templates)}")
+        state = "" if self.written else " (unchanged)"
+        return f"{name}: " + ", ".join(parts) + state
+
+
+def read_defaults(path: str) -> dict[str, list[str]]:
+    """Action -> default keys, in file order."""
+    actions: dict[str, list[str]] = {}
+    with open(path, "r", encoding="utf-8", errors="ignore") as f:
+        for line in f:
+            parsed = parse_line(line)
+            if parsed.get("type") == "bind":
+                actions.setdefault(parsed["action"], []).append(parsed["key"])
+    return actions
+
+
+def diff_defaults(old: dict[str, list[str]], new: dict[str, list[str]]) -> DefaultsDiff:
+    """Compare two defaults catalogs.
+
+    An action that disappears while exactly one new action appears with the
+    same set of default keys is treated as a rename rather than drop + add.
+    """
+    added = {a: keys for a, keys in new.items() if a not in old}
+    removed = {a for a in old if a not in new}
+
+    def signature(keys):
+        return frozenset(normalize_key(k) for k in keys)
+
+    added_by_sig: dict[frozenset, list[str]] = defaultdict(list)
+    for action, keys in added.items():
+        added_by_sig[signature(keys)].append(action)
+    removed_by_sig: dict[frozenset, list[str]] = defaultdict(list)
+    for action in removed:
+        removed_by_sig[signature(old[action])].append(action)
+
+    renamed: dict[str, str] = {}
+    for sig, olds in removed_by_sig.items():
+        news = added_by_sig.get(sig, [])
+        if sig and len(olds) == 1 and len(news) == 1:
+            renamed[olds[0]] = news[0]
+
+    for old_action, new_action in renamed.items():
+        removed.discard(old_action)
+        added.pop(new_action, None)
+    return DefaultsDiff(added=added, removed=removed, renamed=renamed)
+
+
+def _duplicate_keys(binds: list[tuple[str, str]]) -> set[str]:
+    counts: dict[str, int] = defaultdict(int)
+    for key, _action in binds:
+        norm = normalize_key(key)
+        if norm and norm != "unbound":
+            counts[norm] += 1
+    return {k for k, c in counts.items() if c > 1}
+
+
+def _template_block(lines: list[str], i: int) -> tuple[BindTemplate, int] | None:
+    """(template, index after its //@end) if a valid template block starts at lines[i]."""
+    stripped = lines[i].strip()
+    if not stripped.startswith(TEMPLATE_PREFIX):
+        return None
+    try:
+        template = BindTemplate.parse(stripped)
+    except TemplateError:
+        return None
+    if not template.matches_block(lines, i + 1):
+        return None
+    return template, i + 1 + len(template) + 1
+
+
+def write_atomic(path: str, text: str):
+    """Write `text` to `path` via a temp file in the same folder and os.replace."""
+    directory = os.path.dirname(os.path.abspath(path))
+    fd, tmp = tempfile.mkstemp(prefix=".migrate-", suffix=".tmp", dir=directory)
+    try:
+        # Same settings migrate_preset reads with, so untouched bytes round-trip exactly
+        with os.fdopen(fd, "w", encoding="utf-8", errors="surrogateescape", newline="") as f:
+            f.write(text)
+        if os.path.exists(path):
+            shutil.copymode(path, tmp)  # mkstemp creates owner-only files
+        os.replace(tmp, path)
+    except BaseException:
+        try:
+            os.remove(tmp)
+        except OSError:
+            pass
+        raise
+
+
+def migrate_preset(path: str, diff: DefaultsDiff, dry_run: bool = False) -> MigrationReport:
+    """Apply `diff` to one preset file and report what changed."""
+    report = MigrationReport(path=path)
+    try:
+        # Lossless read: stray non-UTF-8 bytes and CRLF endings are written back unchanged
+        with open(path, "r", encoding="utf-8", errors="surrogateescape", newline="") as f:
+            lines = f.readlines()
+        newline = "\r\n" if lines and lines[0].endswith("\r\n") else "\n"
+
+        before: list[tuple[str, str]] = []
+        after: list[tuple[str, str]] = []
+        out: list[str] = []
+        present: set[str] = set()
+        i = 0
+        while i < len(lines):
+            line = lines[i]
+            i += 1
+            block = _template_block(lines, i - 1)
+            if block is not None:
+                # Generated binds must match their directive, so the block is never edited
+                # line by line; templates that use a changed action are left for the user
+                template, end = block
+                out.extend(lines[i - 1:end])
+                binds = list(template)
+                before.extend(binds)
+                after.extend(binds)
+                actions = {action for _key, action in binds}
+                present.update(actions)
+                if actions & (diff.removed | set(diff.renamed)):
+                    report.templates.append(template.directive)
+                i = end
+                continue
+            parsed = parse_line(line)
+            if parsed.get("type") != "bind":
+                out.append(line)
+                continue
+            key, action = parsed["key"], parsed["action"]
+            before.append((key, action))
+            if action in diff.removed:
+                if action not in report.dropped:
+                    report.dropped.append(action)
+                continue
+            if action in diff.renamed:
+                new_action = diff.renamed[action]
+                if (action, new_action) not in report.renamed:
+                    report.renamed.append((action, new_action))
+                action = new_action
+                ending = line[len(line.rstrip("\r\n")):]
+                line = f"bind          {key:<15}  {action}{ending}"
+            out.append(line)
+            after.append((key, action))
+            present.add(action)
+
+        additions = [(a, keys) for a, keys in diff.added.items() if a not in present]
+        if additions:
+            if out and not out[-1].endswith("\n"):
+                out[-1] += newline
+            for action, keys in additions:
+                report.added.append(action)
+                for key in keys:
+                    out.append(f"bind          {key:<15}  {action}{newline}")
+                    after.append((key, action))
+
+        report.new_conflicts = sorted(_duplicate_keys(after) - _duplicate_keys(before))
+        changed = bool(report.added or report.dropped or report.renamed)
+        if changed and not dry_run:
+            write_atomic(path, "".join(out))
+            report.written = True
+    except OSError as e:
+        report.error = str(e)
+    return report
+
+
+def migrate_presets(
+    old_defaults: str,
+    new_defaults: str,
+    preset_paths: list[str],
+    dry_run: bool = False,
+    max_workers: int | None = None,
+) -> tuple[DefaultsDiff, list[MigrationReport]]:
+    """Diff the defaults once, then migrate every preset in a process pool."""
+    diff = diff_defaults(read_defaults(old_defaults), read_defaults(new_defaults))
+    if diff.is_empty or not preset_paths:
+        return diff, [MigrationReport(path=p) for p in preset_paths]
+    if len(preset_paths) == 1:
+        # Not worth spinning up worker processes
+        return diff, [migrate_preset(preset_paths[0], diff, dry_run)]
+    with ProcessPoolExecutor(max_workers=max_workers) as pool:
+        reports = list(pool.map(
+            migrate_preset, preset_paths, [diff] * len(preset_paths), [dry_run] * len(preset_paths)
+        ))
+    return diff, reports
+
+
+def main(argv: list[str]) -> int:
+    args = [a for a in argv if a != "--dry-run"]
+    if len(args) < 3:
+        print(__doc__.strip())
+        return 2
+    old_defaults, new_defaults, *presets = args
+    diff, reports = migrate_presets(old_defaults, new_defaults, presets, dry_run="--dry-run" in argv)
+    print(f"Defaults: +{len(diff.added)} new, -{len(diff.removed)} removed, {len(diff.renamed)} renamed")
+    for report in reports:
+        print(report.summary())
+    return 1 if any(r.error for r in reports) else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))
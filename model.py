@@ -1,9 +1,14 @@
 # model.py
 import os
+from bisect import bisect_right
 from dataclasses import dataclass, field
-from collections import defaultdict
+from collections import Counter, defaultdict
 from PyQt6.QtCore import QAbstractTableModel, Qt, QModelIndex
 
+from templates import BindTemplate, TemplateError, TEMPLATE_PREFIX
+from action_catalog import ActionCatalog
+from util import bundled_defaults
+
 # A clean data structure for a single keybind
 def _normalize_token(tok: str) -> str:
     t = tok.strip().lower()
@@ -67,6 +72,18 @@ def normalize_key(key: str | None) -> str:
         return ""
     seq = [_normalize_combo(k.strip()) for k in key.split(',') if k.strip()]
     return ",".join(seq)
+
+def parse_line(line: str) -> dict:
+    """Classify one uikeys.txt line as a bind ({type, key, action}) or other text."""
+    stripped = line.strip()
+    if not stripped or stripped.startswith("//"):
+        return {"type": "other", "original": line}
+    parts = stripped.split(None, 2)
+    if len(parts) > 1 and parts[0] == "bind":
+        if len(parts) == 3:
+            return {"type": "bind", "key": parts[1], "action": parts[2]}
+    return {"type": "other", "original": line}
+
 @dataclass
 class Keybind:
     id: int
@@ -74,6 +91,7 @@ class Keybind:
     key: str
     original_key: str | None
     is_synthetic: bool = False
+    is_generated: bool = False  # Expanded from a BindTemplate; read-only
 
     @property
     def is_bound(self) -> bool:
@@ -87,6 +105,27 @@ class Keybind:
         orig = normalize_key(self.original_key)
         return curr != orig
 
+@dataclass
+class _TemplateSummary:
+    """What duplicate checks and the occupancy map need from a template, from one expansion."""
+    key_counts: Counter  # normalized key -> binds
+    binds: Counter       # (normalized key, action) -> binds
+    actions: set
+
+    @classmethod
+    def of(cls, template: BindTemplate) -> "_TemplateSummary":
+        binds = Counter()
+        for key, action in template:
+            norm = normalize_key(key)
+            if norm:
+                binds[(norm, action)] += 1
+        key_counts = Counter()
+        actions = set()
+        for (norm, action), n in binds.items():
+            key_counts[norm] += n
+            actions.add(action)
+        return cls(key_counts, binds, actions)
+
 # The model that interfaces with Qt's Model/View framework
 class KeybindTableModel(QAbstractTableModel):
     HEADERS = ["Action", "Key", "", ""] # Columns for Action, Key, Unbind, Reset
@@ -97,12 +136,27 @@ class KeybindTableModel(QAbstractTableModel):
         self._other_lines: list[str] = [] # For comments, etc.
         self._default_action_to_keys: dict[str, list[str]] = {}
         self._duplicate_keys = set()
+        # Template-generated rows follow _keybinds and are built only when asked for
+        self._templates: list[BindTemplate] = []
+        self._template_starts: list[int] = []  # First generated row index of each template
+        self._generated_count = 0
+        self._template_summaries: dict[BindTemplate, _TemplateSummary] = {}
+        self._generated_key_counts: Counter = Counter()  # Normalized key -> generated binds
+        self._generated_duplicates: set[str] = set()
         # Normalization helpers moved to module level
+        self._session = None  # Optional journal.SessionStore for crash-safe autosave
+        self._occupancy = None  # Optional free_keys.KeyOccupancy, updated per edit
+        self._catalog = ActionCatalog(())  # Known actions from the defaults file
+        self._unknown_actions: dict[str, list[str] | None] = {}  # action -> suggestions (None until asked)
+        self._source_path: str | None = None
+        self._defaults_path: str | None = None
+        self._unsaved = False  # Edits since the source file was last loaded or saved
+        self.load_warnings: list[str] = []  # Problems found by the last load_from_file
 
     # --- Required QAbstractTableModel methods ---
 
     def rowCount(self, parent=QModelIndex()):
-        return len(self._keybinds)
+        return len(self._keybinds) + self._generated_count
 
     def columnCount(self, parent=QModelIndex()):
         return len(self.HEADERS)
@@ -111,7 +165,7 @@ class KeybindTableModel(QAbstractTableModel):
         if not index.isValid():
             return None
 
-        keybind = self._keybinds[index.row()]
+        keybind = self.keybind_at(index.row())
         col = index.column()
 
         if role == Qt.ItemDataRole.DisplayRole:
@@ -127,6 +181,20 @@ class KeybindTableModel(QAbstractTableModel):
         elif role == Qt.ItemDataRole.UserRole: # Return the whole object for delegates
             return keybind
             
+        elif role == Qt.ItemDataRole.ToolTipRole and col == 0 and self.is_unknown_action(keybind.action):
+            suggestions = self.suggest_actions(keybind.action)
+            hint = f" Did you mean: {', '.join(suggestions)}?" if suggestions else ""
+            return f"Unknown action (not in default keys.txt).{hint}"
+
+        elif role == Qt.ItemDataRole.ForegroundRole and col == 0:
+            if self.is_unknown_action(keybind.action):
+                from PyQt6.QtGui import QColor
+                return QColor("#e0a040")
+
+        elif role == Qt.ItemDataRole.ToolTipRole and col == 1 and keybind.is_generated:
+            template = self._template_for_row(index.row())
+            return f"Generated by template: {template.directive}"
+
         elif role == Qt.ItemDataRole.ToolTipRole and col == 1:
             default_key = self.get_default_key(keybind.action)
             parts = []
@@ -146,15 +214,28 @@ class KeybindTableModel(QAbstractTableModel):
         if role == Qt.ItemDataRole.EditRole and index.column() == 1:
             row = index.row()
             if 0 <= row < len(self._keybinds):
-                self._keybinds[row].key = value
+                old_key = normalize_key(self._keybinds[row].key)
+                self._set_key(row, value)
                 self.check_for_duplicates()
                 # Emit dataChanged for the whole row to update buttons and duplicate coloring
                 self.dataChanged.emit(self.index(row, 0), self.index(row, self.columnCount() - 1))
-                # Also emit dataChanged for all other rows to update duplicate status
-                self.dataChanged.emit(self.index(0, 1), self.index(self.rowCount()-1, 1), [Qt.ItemDataRole.BackgroundRole])
+                # Also emit dataChanged for the other hand-written rows to update duplicate status
+                self.dataChanged.emit(
+                    self.index(0, 1), self.index(len(self._keybinds) - 1, 1), [Qt.ItemDataRole.BackgroundRole]
+                )
+                # Generated rows only change color if their template produces the old or new key
+                self._emit_generated_background({old_key, normalize_key(value)} - {""})
                 return True
         return False
 
+    def _emit_generated_background(self, norm_keys: set[str]):
+        for start, template in zip(self._template_starts, self._templates):
+            counts = self._template_summary(template).key_counts
+            if any(counts[key] for key in norm_keys):
+                self.dataChanged.emit(
+                    self.index(start, 1), self.index(start + len(template) - 1, 1), [Qt.ItemDataRole.BackgroundRole]
+                )
+
     def headerData(self, section, orientation, role):
         if role == Qt.ItemDataRole.DisplayRole and orientation == Qt.Orientation.Horizontal:
             return self.HEADERS[section]
@@ -173,25 +254,110 @@ class KeybindTableModel(QAbstractTableModel):
 
     # --- Custom Model Logic ---
 
+    def keybind_at(self, row: int) -> Keybind:
+        if row < len(self._keybinds):
+            return self._keybinds[row]
+        # Materialize a generated row on demand; nothing is kept around
+        pos = bisect_right(self._template_starts, row) - 1
+        key, action = self._templates[pos].expand_one(row - self._template_starts[pos])
+        return Keybind(id=-1, action=action, key=key, original_key=key, is_generated=True)
+
+    def _template_for_row(self, row: int) -> BindTemplate:
+        return self._templates[bisect_right(self._template_starts, row) - 1]
+
+    def _template_summary(self, template: BindTemplate) -> _TemplateSummary:
+        summary = self._template_summaries.get(template)
+        if summary is None:
+            summary = self._template_summaries[template] = _TemplateSummary.of(template)
+        return summary
+
+    def _reindex_templates(self):
+        self._template_starts = []
+        start = len(self._keybinds)
+        key_counts = Counter()
+        summaries = {}
+        for template in self._templates:
+            self._template_starts.append(start)
+            start += len(template)
+            # Expanded once per distinct template; edits only ever recount _keybinds
+            summary = summaries[template] = self._template_summary(template)
+            key_counts.update(summary.key_counts)
+        self._generated_count = start - len(self._keybinds)
+        self._template_summaries = summaries
+        self._generated_key_counts = key_counts
+        self._generated_duplicates = {key for key, count in key_counts.items() if count > 1}
+
+    @property
+    def templates(self) -> list[BindTemplate]:
+        return list(self._templates)
+
+    def set_templates(self, templates: list[BindTemplate]):
+        self.beginResetModel()
+        self._templates = list(templates)
+        if self._catalog:
+            for template in self._templates:
+                for action in self._template_summary(template).actions:
+                    if not self._catalog.is_known(action):
+                        self._unknown_actions.setdefault(action, None)
+        self._sync_synthetic_rows()
+        self._reindex_templates()
+        self._rebuild_occupancy()
+        self.check_for_duplicates()
+        self._unsaved = True
+        self.endResetModel()
+        # Templates aren't row edits, so the journal can't hold them; snapshot instead
+        self._checkpoint_session()
+
+    def _sync_synthetic_rows(self, next_id: int | None = None):
+        """Keep one 'unbound' row per default action that no bind or template covers."""
+        generated = set()
+        for template in self._templates:
+            generated |= self._template_summary(template).actions
+        # A template now binding the action replaces its placeholder (unless the user bound it)
+        self._keybinds = [
+            kb for kb in self._keybinds
+            if not (kb.is_synthetic and not kb.is_bound and kb.action in generated)
+        ]
+        present = {kb.action for kb in self._keybinds} | generated
+        if next_id is None:
+            next_id = max((kb.id for kb in self._keybinds), default=-1) + 1
+        for action in sorted(set(self._default_action_to_keys) - present):
+            self._keybinds.append(Keybind(
+                id=next_id, action=action, key="unbound", original_key=None, is_synthetic=True
+            ))
+            next_id += 1
+
+    def _set_key(self, row: int, key: str):
+        """Change one row's key, keeping the occupancy map and edit journal in step."""
+        kb = self._keybinds[row]
+        if self._occupancy is not None and kb.is_bound:
+            self._occupancy.remove(kb.key, kb.action)
+        kb.key = key
+        if self._occupancy is not None and kb.is_bound:
+            self._occupancy.add(kb.key, kb.action)
+        self._unsaved = True
+        self._record_edit(row)
+
     def _parse_line(self, line):
-        stripped = line.strip()
-        if not stripped or stripped.startswith("//"):
-            return {"type": "other", "original": line}
-        parts = stripped.split(None, 2)
-        if len(parts) > 1 and parts[0] == "bind":
-            if len(parts) == 3:
-                return {"type": "bind", "key": parts[1], "action": parts[2]}
-        return {"type": "other", "original": line}
+        return parse_line(line)
 
     def load_from_file(self, filepath: str, defaults_path: str):
         self.beginResetModel()
         self._keybinds.clear()
         self._other_lines.clear()
         self._default_action_to_keys.clear()
+        self._templates = []
+        self.load_warnings = []
 
         # Load defaults first (robust against mispackaged directories)
         default_actions = set()
-        if defaults_path:
+        preparsed = bundled_defaults(defaults_path)
+        if preparsed is not None:
+            # Frozen build: parsed at build time, no file search or parsing needed
+            for act, keys in preparsed.items():
+                default_actions.add(act)
+                self._default_action_to_keys[act] = list(keys)
+        elif defaults_path:
             candidates: list[str] = []
             if os.path.isfile(defaults_path):
                 candidates.append(defaults_path)
@@ -227,7 +393,29 @@ class KeybindTableModel(QAbstractTableModel):
             lines = f.readlines()
 
         current_actions = set()
+        skip_until = 0
         for i, line in enumerate(lines):
+            if i < skip_until:
+                continue  # Generated binds are regenerated from the directive, never stored
+            stripped = line.strip()
+            if stripped.startswith(TEMPLATE_PREFIX):
+                try:
+                    template = BindTemplate.parse(stripped)
+                except TemplateError as e:
+                    self.load_warnings.append(f"Line {i + 1}: template ignored ({e})")
+                    self._other_lines.append(line)
+                    continue
+                if template.matches_block(lines, i + 1):
+                    self._templates.append(template)
+                    skip_until = i + 1 + len(template) + 1  # Binds plus the end marker
+                else:
+                    # Edited by hand (or missing //@end): keep the binds as they are
+                    self.load_warnings.append(
+                        f"Line {i + 1}: template block doesn't match its directive; "
+                        "its binds were kept as ordinary binds"
+                    )
+                    self._other_lines.append(line)
+                continue
             parsed = self._parse_line(line)
             if parsed.get("type") == "bind":
                 action = parsed["action"]
@@ -237,17 +425,21 @@ class KeybindTableModel(QAbstractTableModel):
             else:
                 self._other_lines.append(parsed["original"])
 
+        for template in self._templates:
+            current_actions.update(self._template_summary(template).actions)
+        self._validate_actions(default_actions, current_actions)
+
         # Add missing actions from defaults
-        missing_actions = sorted(list(default_actions - current_actions))
-        next_id = len(lines)
-        for action in missing_actions:
-            self._keybinds.append(Keybind(
-                id=next_id, action=action, key="unbound", original_key=None, is_synthetic=True
-            ))
-            next_id += 1
-        
+        self._sync_synthetic_rows(next_id=len(lines))
+
+        self._source_path = os.path.abspath(filepath)
+        self._defaults_path = defaults_path
+        self._unsaved = False
+        self._reindex_templates()
+        self._rebuild_occupancy()
         self.check_for_duplicates()
         self.endResetModel()
+        self._checkpoint_session()
 
     def save_to_file(self, filepath: str):
         with open(filepath, "w") as f:
@@ -260,6 +452,157 @@ class KeybindTableModel(QAbstractTableModel):
                 if kb.is_bound:
                     f.write(f"bind          {kb.key:<15}  {kb.action}\n")
 
+            # Stream each expansion straight to disk
+            for template in self._templates:
+                f.writelines(template.iter_lines())
+        # Saving over the session's source makes the journal redundant
+        if self._source_path == os.path.abspath(filepath):
+            self._unsaved = False
+            self._checkpoint_session()
+
+    # --- Action validation ---
+
+    def _validate_actions(self, default_actions, actions):
+        """Check each distinct action against the defaults catalog (set lookups only)."""
+        self._catalog = ActionCatalog(default_actions)
+        self._unknown_actions = {}
+        if not self._catalog:
+            return  # No defaults loaded; nothing to validate against
+        for action in actions:
+            if not self._catalog.is_known(action):
+                self._unknown_actions[action] = None
+
+    def is_unknown_action(self, action: str) -> bool:
+        return action in self._unknown_actions
+
+    def unknown_actions(self) -> list[str]:
+        return sorted(self._unknown_actions)
+
+    def suggest_actions(self, action: str) -> list[str]:
+        """Nearest known actions for an unknown one; computed once per action."""
+        if action not in self._unknown_actions:
+            return []
+        if self._unknown_actions[action] is None:
+            self._unknown_actions[action] = self._catalog.suggest(action)
+        return self._unknown_actions[action]
+
+    # --- Session autosave ---
+
+    def attach_session(self, session):
+        self._session = session
+
+    # --- Free-key occupancy ---
+
+    def attach_occupancy(self, occupancy):
+        self._occupancy = occupancy
+        self._rebuild_occupancy()
+
+    def _rebuild_occupancy(self):
+        # Full pass only on load/template changes; single edits go through _set_key
+        if self._occupancy is None:
+            return
+        self._occupancy.clear()
+        for kb in self._keybinds:
+            if kb.is_bound:
+                self._occupancy.add(kb.key, kb.action)
+        for template in self._templates:
+            for (key, action), count in self._template_summary(template).binds.items():
+                self._occupancy.add(key, action, count, normalized=True)
+
+    def suggest_free_keys(self, row: int, limit: int = 10) -> list[str]:
+        if self._occupancy is None:
+            return []
+        return self._occupancy.suggest(self.keybind_at(row).action, limit)
+
+    def _export_state(self) -> dict:
+        return {
+            "keybinds": [(kb.id, kb.action, kb.key, kb.original_key, kb.is_synthetic) for kb in self._keybinds],
+            "other_lines": self._other_lines,
+            "default_action_to_keys": self._default_action_to_keys,
+            "templates": [t.directive for t in self._templates],
+            "unsaved": self._unsaved,  # Template edits live only in the snapshot
+        }
+
+    def _checkpoint_session(self):
+        if self._session is None or not self._source_path:
+            return
+        try:
+            self._session.save_snapshot(self._source_path, self._defaults_path, self._export_state())
+        except OSError:
+            # Autosave is best-effort; never block loading or saving on it
+            pass
+
+    def _record_edit(self, row: int):
+        if self._session is None:
+            return
+        kb = self._keybinds[row]
+        try:
+            self._session.record_edit(kb.id, kb.key, kb.action)
+        except OSError:
+            pass
+
+    def restore_session(self, filepath: str, defaults_path: str) -> bool:
+        """Restore the last session for `filepath` without re-parsing, including unsaved edits.
+
+        Returns False if there is no usable snapshot; the caller should fall back to load_from_file.
+        """
+        if self._session is None:
+            return False
+        state = self._session.load_snapshot(filepath, defaults_path)
+        if state is None:
+            return False
+        edits = self._session.journal.entries()
+
+        self.beginResetModel()
+        self._keybinds = [
+            Keybind(id=i, action=a, key=k, original_key=o, is_synthetic=s)
+            for (i, a, k, o, s) in state["keybinds"]
+        ]
+        self._other_lines = list(state["other_lines"])
+        self._default_action_to_keys = dict(state["default_action_to_keys"])
+        self._templates = [BindTemplate.parse(d) for d in state.get("templates", [])]
+        current_actions = {kb.action for kb in self._keybinds}
+        for template in self._templates:
+            current_actions.update(self._template_summary(template).actions)
+        self._validate_actions(self._default_action_to_keys, current_actions)
+        for kb in self._keybinds:
+            edit = edits.get(kb.id)
+            if edit and edit[1] == kb.action:
+                kb.key = edit[0]
+        self._source_path = os.path.abspath(filepath)
+        self._defaults_path = defaults_path
+        self._unsaved = state.get("unsaved", False) or bool(edits)
+        self._reindex_templates()
+        self._rebuild_occupancy()
+        self.check_for_duplicates()
+        self.endResetModel()
+        return True
+
+    def apply_edits(self, edits: dict[int, tuple[str, str]]) -> int:
+        """Reapply journal edits from an older parse of the file; returns how many matched.
+
+        Rows are matched by id (line number) when the action still agrees,
+        otherwise by action if exactly one row has it, since lines may have moved.
+        """
+        rows_by_action: dict[str, list[int]] = defaultdict(list)
+        for row, kb in enumerate(self._keybinds):
+            rows_by_action[kb.action].append(row)
+        row_by_id = {kb.id: row for row, kb in enumerate(self._keybinds)}
+        touched = []
+        for kb_id, (key, action) in edits.items():
+            row = row_by_id.get(kb_id)
+            if row is None or self._keybinds[row].action != action:
+                candidates = rows_by_action.get(action, [])
+                row = candidates[0] if len(candidates) == 1 else None
+            if row is not None:
+                self._set_key(row, key)
+                touched.append(row)
+        self._finish_bulk_edit(touched)
+        return len(touched)
+
+    def has_unsaved_edits(self) -> bool:
+        return self._unsaved
+
     def check_for_duplicates(self):
         key_counts = defaultdict(int)
         for kb in self._keybinds:
@@ -267,7 +610,10 @@ class KeybindTableModel(QAbstractTableModel):
                 norm = normalize_key(kb.key)
                 if norm:
                     key_counts[norm] += 1
-        self._duplicate_keys = {key for key, count in key_counts.items() if count > 1}
+        # Template keys were counted once, when the templates were indexed
+        generated = self._generated_key_counts
+        self._duplicate_keys = {key for key, count in key_counts.items() if count + generated[key] > 1}
+        self._duplicate_keys |= self._generated_duplicates
 
     def get_default_key(self, action: str) -> str | None:
         keys = self._default_action_to_keys.get(action)
@@ -286,39 +632,59 @@ class KeybindTableModel(QAbstractTableModel):
         return False
 
     def unbind_keybind(self, row: int):
-        if 0 <= row < len(self._keybinds):
-            self._keybinds[row].key = "unbound"
-            self.check_for_duplicates()
-            # Emit dataChanged for the whole row to update all columns
-            self.dataChanged.emit(self.index(row, 0), self.index(row, self.columnCount() - 1))
-
-    def reset_keybind(self, row: int):
-        if 0 <= row < len(self._keybinds):
-            keybind = self._keybinds[row]
-            # Prefer true defaults from defaults file; fall back to original.
-            defaults = self.get_default_keys(keybind.action)
-            chosen = None
-            if defaults:
-                # Try to pick the default that best matches the original or current (normalized)
-                norm_orig = normalize_key(keybind.original_key)
-                norm_curr = normalize_key(keybind.key)
-                # Exact match to original default
+        self.unbind_rows([row])
+
+    def unbind_rows(self, rows):
+        """Unbind several rows with a single duplicate check and repaint."""
+        touched = [r for r in rows if 0 <= r < len(self._keybinds)]
+        for row in touched:
+            self._set_key(row, "unbound")
+        self._finish_bulk_edit(touched)
+
+    def _default_for(self, keybind: Keybind) -> str | None:
+        # Prefer true defaults from defaults file; fall back to original.
+        defaults = self.get_default_keys(keybind.action)
+        chosen = None
+        if defaults:
+            # Try to pick the default that best matches the original or current (normalized)
+            norm_orig = normalize_key(keybind.original_key)
+            norm_curr = normalize_key(keybind.key)
+            # Exact match to original default
+            for d in defaults:
+                if normalize_key(d) == norm_orig and norm_orig:
+                    chosen = d
+                    break
+            if not chosen:
                 for d in defaults:
-                    if normalize_key(d) == norm_orig and norm_orig:
+                    if normalize_key(d) == norm_curr and norm_curr:
                         chosen = d
                         break
-                if not chosen:
-                    for d in defaults:
-                        if normalize_key(d) == norm_curr and norm_curr:
-                            chosen = d
-                            break
-                if not chosen:
-                    # Fallback to first default
-                    chosen = defaults[0]
-            else:
-                chosen = keybind.original_key
+            if not chosen:
+                # Fallback to first default
+                chosen = defaults[0]
+        else:
+            chosen = keybind.original_key
+        return chosen
+
+    def reset_keybind(self, row: int):
+        self.reset_rows([row])
+
+    def reset_rows(self, rows):
+        """Reset several rows with a single duplicate check and repaint."""
+        touched = [r for r in rows if 0 <= r < len(self._keybinds)]
+        for row in touched:
+            self._set_key(row, self._default_for(self._keybinds[row]) or "unbound")
+        self._finish_bulk_edit(touched)
+
+    def _finish_bulk_edit(self, rows: list[int]):
+        if not rows:
+            return
+        self.check_for_duplicates()
+        # Emit dataChanged for the whole rows to update all columns
+        self.dataChanged.emit(self.index(min(rows), 0), self.index(max(rows), self.columnCount() - 1))
 
-            keybind.key = chosen or "unbound"
-            self.check_for_duplicates()
-            # Emit dataChanged for the whole row
-            self.dataChanged.emit(self.index(row, 0), self.index(row, self.columnCount() - 1))
\ No newline at end of file
+    def sort_by_original_order(self):
+        # Row ids are file line numbers (synthetic rows follow), so this is file order
+        self.beginResetModel()
+        self._keybinds.sort(key=lambda kb: kb.id)
+        self.endResetModel()
@@ -0,0 +1,206 @@
+# preset_library.py
+import os
+import sqlite3
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass
+
+from model import parse_line, normalize_key
+
+PRESET_EXTENSIONS = (".txt",)
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS files (
+    path     TEXT PRIMARY KEY,
+    mtime_ns INTEGER NOT NULL,
+    size     INTEGER NOT NULL
+);
+CREATE TABLE IF NOT EXISTS binds (
+    path     TEXT NOT NULL REFERENCES files(path) ON DELETE CASCADE,
+    line     INTEGER NOT NULL,
+    key      TEXT NOT NULL,
+    norm_key TEXT NOT NULL,
+    action   TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS binds_norm_key ON binds(norm_key);
+CREATE INDEX IF NOT EXISTS binds_action ON binds(action);
+CREATE INDEX IF NOT EXISTS binds_path ON binds(path);
+CREATE TABLE IF NOT EXISTS meta (
+    name  TEXT PRIMARY KEY,
+    value TEXT
+);
+"""
+
+
+def parse_preset(path: str) -> list[tuple[int, str, str, str]]:
+    """Parse one preset into (line, key, normalized key, action) rows."""
+    rows = []
+    with open(path, "r", encoding="utf-8", errors="ignore") as f:
+        for i, line in enumerate(f):
+            parsed = parse_line(line)
+            if parsed.get("type") == "bind":
+                key = parsed["key"]
+                rows.append((i, key, normalize_key(key), parsed["action"]))
+    return rows
+
+
+def _iter_presets(folder: str):
+    """Yield (path, mtime_ns, size) for every preset file below `folder`."""
+    stack = [folder]
+    while stack:
+        current = stack.pop()
+        try:
+            with os.scandir(current) as it:
+                for entry in it:
+                    try:
+                        if entry.is_dir(follow_symlinks=False):
+                            stack.append(entry.path)
+                        elif entry.name.lower().endswith(PRESET_EXTENSIONS):
+                            st = entry.stat()
+                            yield os.path.abspath(entry.path), st.st_mtime_ns, st.st_size
+                    except OSError:
+                        continue
+        except OSError:
+            continue
+
+
+def _parse_quietly(path: str):
+    try:
+        return parse_preset(path)
+    except OSError:
+        # Unreadable right now; it stays out of the index until the next scan
+        return None
+
+
+@dataclass
+class ScanResult:
+    on_disk: dict[str, tuple[int, int]]   # path -> (mtime_ns, size)
+    parsed: list[tuple[str, list]]         # (path, rows) for new or changed presets
+    removed: list[str]
+    changed: int
+
+
+def collect_changes(folder: str, known: dict[str, tuple[int, int]], max_workers: int | None = None) -> ScanResult:
+    """Walk `folder` and parse whatever differs from `known` (PresetIndex.known_files()).
+
+    Touches no database, so it can run off the UI thread; parsing is CPU-bound
+    and runs in worker processes.
+    """
+    folder = os.path.abspath(folder)
+    on_disk = {path: (mtime, size) for path, mtime, size in _iter_presets(folder)}
+    changed = [path for path, stamp in on_disk.items() if known.get(path) != stamp]
+    # The index mirrors a single folder, so anything indexed from elsewhere goes too
+    removed = [path for path in known if path not in on_disk]
+
+    if len(changed) <= 1:
+        # Not worth spinning up worker processes
+        results = [_parse_quietly(path) for path in changed]
+    else:
+        with ProcessPoolExecutor(max_workers=max_workers) as pool:
+            results = list(pool.map(_parse_quietly, changed, chunksize=32))
+    parsed = [(path, rows) for path, rows in zip(changed, results) if rows is not None]
+    return ScanResult(on_disk=on_disk, parsed=parsed, removed=removed, changed=len(changed))
+
+
+def _is_under(path: str, folder: str) -> bool:
+    path, folder = os.path.normcase(path), os.path.normcase(folder)
+    return path == folder or path.startswith(folder.rstrip(os.sep) + os.sep)
+
+
+class PresetIndex:
+    """SQLite index of action/key postings across a folder of presets.
+
+    Files are keyed by path + mtime + size, so a rescan only re-parses files
+    that were added or changed since the previous scan.
+    """
+
+    def __init__(self, db_path: str):
+        self.db_path = db_path
+        self._conn = sqlite3.connect(db_path)
+        self._conn.execute("PRAGMA foreign_keys = ON")
+        self._conn.execute("PRAGMA journal_mode = WAL")
+        self._conn.executescript(_SCHEMA)
+
+    def close(self):
+        self._conn.close()
+
+    # --- Settings ---
+
+    def get_folder(self) -> str | None:
+        row = self._conn.execute("SELECT value FROM meta WHERE name = 'folder'").fetchone()
+        return row[0] if row else None
+
+    def set_folder(self, folder: str):
+        """Point the index at `folder`; presets indexed from anywhere else are dropped."""
+        folder = os.path.abspath(folder)
+        outside = [(path,) for (path,) in self._conn.execute("SELECT path FROM files") if not _is_under(path, folder)]
+        with self._conn:
+            self._conn.execute("INSERT OR REPLACE INTO meta(name, value) VALUES ('folder', ?)", (folder,))
+            # Their binds go with them (ON DELETE CASCADE)
+            self._conn.executemany("DELETE FROM files WHERE path = ?", outside)
+
+    # --- Scanning ---
+
+    def known_files(self) -> dict[str, tuple[int, int]]:
+        """Indexed path -> (mtime_ns, size), the input collect_changes() compares against."""
+        return {
+            path: (mtime, size)
+            for path, mtime, size in self._conn.execute("SELECT path, mtime_ns, size FROM files")
+        }
+
+    def scan(self, folder: str, max_workers: int | None = None) -> dict[str, int]:
+        """Bring the index up to date with `folder`, blocking until done.
+
+        Returns counts of files that were parsed, removed and left untouched.
+        """
+        return self.apply_scan(collect_changes(folder, self.known_files(), max_workers))
+
+    def apply_scan(self, result: ScanResult) -> dict[str, int]:
+        """Write a collect_changes() result; must run on the thread that owns the connection."""
+        # All writes happen here, in one transaction
+        with self._conn:
+            self._conn.executemany("DELETE FROM files WHERE path = ?", [(p,) for p in result.removed])
+            for path, rows in result.parsed:
+                mtime, size = result.on_disk[path]
+                self._conn.execute("DELETE FROM binds WHERE path = ?", (path,))
+                self._conn.execute(
+                    "INSERT OR REPLACE INTO files(path, mtime_ns, size) VALUES (?, ?, ?)", (path, mtime, size)
+                )
+                self._conn.executemany(
+                    "INSERT INTO binds(path, line, key, norm_key, action) VALUES (?, ?, ?, ?, ?)",
+                    [(path, line, key, norm, action) for line, key, norm, action in rows],
+                )
+
+        return {
+            "parsed": len(result.parsed),
+            "removed": len(result.removed),
+            "unchanged": len(result.on_disk) - result.changed,
+        }
+
+    # --- Queries ---
+
+    def file_count(self) -> int:
+        return self._conn.execute("SELECT COUNT(*) FROM files").fetchone()[0]
+
+    def find_by_key(self, key: str, limit: int = 1000) -> list[tuple[str, str, str]]:
+        """Presets binding `key` (normalized, so Ctrl+a matches ctrl+sc_a): (path, key, action)."""
+        norm = normalize_key(key)
+        if not norm:
+            return []
+        return self._conn.execute(
+            "SELECT path, key, action FROM binds WHERE norm_key = ? ORDER BY path, line LIMIT ?",
+            (norm, limit),
+        ).fetchall()
+
+    def find_by_action(self, action: str, exact: bool = False, limit: int = 1000) -> list[tuple[str, str, str]]:
+        """Presets using `action` (exact, or as a substring): (path, key, action)."""
+        action = action.strip()
+        if not action:
+            return []
+        if exact:
+            sql = "SELECT path, key, action FROM binds WHERE action = ? ORDER BY path, line LIMIT ?"
+            arg = action
+        else:
+            escaped = action.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+            sql = "SELECT path, key, action FROM binds WHERE action LIKE ? ESCAPE '\\' ORDER BY path, line LIMIT ?"
+            arg = f"%{escaped}%"
+        return self._conn.execute(sql, (arg, limit)).fetchall()
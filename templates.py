@@ -0,0 +1,137 @@
+# templates.py
+"""Bind templates: one definition that expands into a family of binds.
+
+A template is stored in the keybind file as a comment directive followed by
+its generated binds, so the game sees plain `bind` lines and the editor can
+regenerate them:
+
+    //@template Alt+{n} add_to_autogroup {n} | n=0..9
+    bind          Alt+0            add_to_autogroup 0
+    ...
+    //@end
+
+Variables are either a numeric range (`n=0..9`) or a comma-separated list
+(`mod=,Ctrl+,Shift+`; a leading comma gives an empty value). A template with
+several variables expands to every combination, first variable slowest.
+"""
+import re
+from dataclasses import dataclass, field
+
+TEMPLATE_PREFIX = "//@template"
+TEMPLATE_END = "//@end"
+
+_PLACEHOLDER = re.compile(r"\{(\w+)\}")
+
+
+class TemplateError(ValueError):
+    pass
+
+
+def _parse_values(spec: str) -> list[str]:
+    spec = spec.strip()
+    m = re.fullmatch(r"(-?\d+)\.\.(-?\d+)", spec)
+    if m:
+        start, stop = int(m.group(1)), int(m.group(2))
+        step = 1 if stop >= start else -1
+        return [str(i) for i in range(start, stop + step, step)]
+    return [v.strip() for v in spec.split(",")]
+
+
+@dataclass(frozen=True)
+class BindTemplate:
+    key_pattern: str
+    action_pattern: str
+    variables: tuple[tuple[str, tuple[str, ...]], ...]
+    specs: tuple[str, ...] = field(default=(), compare=False)  # As written, for round-tripping
+
+    @classmethod
+    def parse(cls, directive: str) -> "BindTemplate":
+        """Build a template from a `//@template ...` line (prefix optional)."""
+        text = directive.strip()
+        if text.startswith(TEMPLATE_PREFIX):
+            text = text[len(TEMPLATE_PREFIX):]
+        head, *specs = text.split("|")
+        parts = head.strip().split(None, 1)
+        if len(parts) != 2:
+            raise TemplateError("expected '<key pattern> <action pattern> | var=values ...'")
+        key_pattern, action_pattern = parts[0], parts[1].strip()
+
+        variables: list[tuple[str, tuple[str, ...]]] = []
+        for spec in specs:
+            name, sep, values = spec.partition("=")
+            name = name.strip()
+            if not sep or not name.isidentifier():
+                raise TemplateError(f"bad variable definition: {spec.strip()!r}")
+            if any(name == defined for defined, _ in variables):
+                raise TemplateError(f"variable defined twice: {name}")
+            variables.append((name, tuple(_parse_values(values))))
+        specs = tuple(spec.strip() for spec in specs)
+
+        defined = {name for name, _ in variables}
+        used = set(_PLACEHOLDER.findall(key_pattern)) | set(_PLACEHOLDER.findall(action_pattern))
+        if used - defined:
+            raise TemplateError(f"undefined variables: {', '.join(sorted(used - defined))}")
+        # A key is one token in the file: a space would push part of it into the action
+        in_key = set(_PLACEHOLDER.findall(key_pattern))
+        for name, values in variables:
+            bad = [v for v in values if name in in_key and any(c.isspace() or c == "," for c in v)]
+            if bad:
+                raise TemplateError(f"{name} is used in the key, so its values can't contain spaces or commas: {bad[0]!r}")
+        return cls(key_pattern, action_pattern, tuple(variables), specs)
+
+    @property
+    def directive(self) -> str:
+        specs = " | ".join(self.specs or (f"{name}={','.join(values)}" for name, values in self.variables))
+        head = f"{TEMPLATE_PREFIX} {self.key_pattern} {self.action_pattern}"
+        return f"{head} | {specs}" if specs else head
+
+    def __len__(self) -> int:
+        n = 1
+        for _, values in self.variables:
+            n *= len(values)
+        return n
+
+    def _bindings(self, i: int) -> dict[str, str]:
+        # Mixed-radix decode: the i-th combination without walking the others
+        result = {}
+        for name, values in reversed(self.variables):
+            i, r = divmod(i, len(values))
+            result[name] = values[r]
+        return result
+
+    @staticmethod
+    def _fill(pattern: str, bindings: dict[str, str]) -> str:
+        return _PLACEHOLDER.sub(lambda m: bindings[m.group(1)], pattern)
+
+    def expand_one(self, i: int) -> tuple[str, str]:
+        """(key, action) of the i-th generated bind."""
+        if not 0 <= i < len(self):
+            raise IndexError(i)
+        bindings = self._bindings(i)
+        return self._fill(self.key_pattern, bindings), self._fill(self.action_pattern, bindings)
+
+    def __iter__(self):
+        for i in range(len(self)):
+            yield self.expand_one(i)
+
+    def iter_keys(self):
+        for i in range(len(self)):
+            yield self._fill(self.key_pattern, self._bindings(i))
+
+    def matches_block(self, lines, start: int) -> bool:
+        """True if lines[start:] holds exactly this template's binds followed by the end marker."""
+        end = start + len(self)
+        if end >= len(lines) or lines[end].strip() != TEMPLATE_END:
+            return False
+        for (key, action), line in zip(self, lines[start:end]):
+            parts = line.split(None, 2)
+            if len(parts) != 3 or parts[0] != "bind" or parts[1] != key or parts[2].strip() != action:
+                return False
+        return True
+
+    def iter_lines(self):
+        """Yield the file lines for this template: directive, binds, end marker."""
+        yield self.directive + "\n"
+        for key, action in self:
+            yield f"bind          {key:<15}  {action}\n"
+        yield TEMPLATE_END + "\n"
@@ -0,0 +1,71 @@
+import hashlib
+import json
+import os
+import sys
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[1]
+MANIFEST_NAME = "resource_manifest.json"
+DEFAULTS_NAME = "default keys.txt"
+
+
+def _parse_defaults(path: Path) -> dict[str, list[str]]:
+    # Same parser the app uses at runtime, so the pre-parsed table is identical
+    sys.path.insert(0, str(ROOT))
+    try:
+        from model import parse_line
+    finally:
+        sys.path.pop(0)
+    actions: dict[str, list[str]] = {}
+    with open(path, "r", encoding="utf-8", errors="ignore") as f:
+        for line in f:
+            parsed = parse_line(line)
+            if parsed.get("type") == "bind":
+                actions.setdefault(parsed["action"], []).append(parsed["key"])
+    return actions
+
+
+def build_manifest(project_dir: str, data_files: list[tuple[str, str]]) -> dict:
+    """Describe where each (source, destination folder) data entry lands in the bundle.
+
+    Paths are '/'-separated and relative to the bundle root.
+    """
+    files: list[str] = []
+    defaults = None
+    for src_rel, dest_dir in data_files:
+        src = Path(project_dir) / src_rel
+        if not src.is_file():
+            continue
+        bundled = src.name if dest_dir in (".", "") else f"{dest_dir.replace(os.sep, '/')}/{src.name}"
+        if bundled not in files:
+            files.append(bundled)
+        if src.name == DEFAULTS_NAME and defaults is None:
+            defaults = {
+                "path": bundled,
+                "sha1": hashlib.sha1(src.read_bytes()).hexdigest(),
+                "actions": _parse_defaults(src),
+            }
+    manifest = {"version": 1, "files": files}
+    if defaults is not None:
+        manifest["defaults"] = defaults
+    return manifest
+
+
+def write_manifest(project_dir: str, data_files: list[tuple[str, str]], out_dir: str) -> str:
+    """Write the manifest into out_dir and return its path (for the spec's datas)."""
+    os.makedirs(out_dir, exist_ok=True)
+    out = os.path.join(out_dir, MANIFEST_NAME)
+    with open(out, "w", encoding="utf-8") as f:
+        json.dump(build_manifest(project_dir, data_files), f, ensure_ascii=False)
+    return out
+
+
+if __name__ == "__main__":
+    # Preview the manifest for the onefile layout
+    print(json.dumps(build_manifest(str(ROOT), [
+        (DEFAULTS_NAME, "."),
+        (os.path.join("assets", "icon.ico"), "assets"),
+        (os.path.join("assets", "icon.png"), "assets"),
+        ("icon.ico", "."),
+        ("icon.png", "."),
+    ]), indent=2))
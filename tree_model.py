@@ -0,0 +1,275 @@
+# tree_model.py
+import re
+from bisect import bisect_left
+from itertools import chain
+from PyQt6.QtCore import QAbstractItemModel, QModelIndex, Qt
+
+# Command families that don't follow the `family_rest` naming (e.g. chatswitchally, quitforce)
+FAMILY_PREFIXES = (
+    "buildmenu", "gridmenu", "selectbox", "selectloop", "select", "edit", "chat", "quit",
+    "group", "camera", "view", "toggle", "move", "build", "load", "unload", "set", "specteam",
+)
+_PLACEHOLDER = re.compile(r"\{\w+\}")
+_GROUP_ID = 0  # internalId of top-level rows; children carry their group index + 1
+
+
+def action_family(action: str) -> str:
+    """Group name for an action: a known command prefix, else the text before the first '_'."""
+    word = action.split(None, 1)[0].lower() if action.strip() else ""
+    for prefix in FAMILY_PREFIXES:
+        if word.startswith(prefix):
+            # selectbox/selectloop fold into select, like the defaults file does
+            return "select" if prefix.startswith("select") else prefix
+    return word.split("_", 1)[0] or "(other)"
+
+
+class _Group:
+    __slots__ = ("name", "segments", "total", "children", "pending", "scanned_to")
+
+    def __init__(self, name: str):
+        self.name = name
+        self.segments: list[range] = []  # Source rows, as ranges so template blocks stay O(1)
+        self.total = 0
+        self.children: list[int] = []   # Source rows fetched (and accepted by the filter) so far
+        self.pending = None             # Iterator over not-yet-fetched source rows
+        self.scanned_to = -1            # Highest source row the fetch has looked at (rows ascend)
+
+    def add(self, rows: range):
+        last = self.segments[-1] if self.segments else None
+        if last is not None and last.stop == rows.start:
+            self.segments[-1] = range(last.start, rows.stop)
+        else:
+            self.segments.append(rows)
+        self.total += len(rows)
+
+    def reset_fetch(self):
+        self.children = []
+        self.pending = chain.from_iterable(self.segments)
+        self.scanned_to = -1
+
+    def scanned(self, row: int) -> bool:
+        """Whether fetching has already decided on `row` (later rows are checked when fetched)."""
+        return self.pending is None or row <= self.scanned_to
+
+
+class KeybindTreeModel(QAbstractItemModel):
+    """Actions grouped by command family over a KeybindTableModel.
+
+    The family index is built once per source reset; a group's children are
+    only materialized (and filtered) when the view expands it and asks to
+    fetch, so collapsed groups cost nothing.
+    """
+
+    HEADERS = ["Action", "Key"]
+    FETCH_BATCH = 200
+
+    def __init__(self, source, parent=None):
+        super().__init__(parent)
+        self._source = source
+        self._groups: list[_Group] = []
+        self._row_lookup: dict[int, tuple[int, int]] = {}  # source row -> (group, child) once fetched
+        self._row_group: list[int] = []  # Group index of each hand-written source row
+        self._filter = None
+        self._build_index()
+        source.modelAboutToBeReset.connect(self.beginResetModel)
+        source.modelReset.connect(self._on_source_reset)
+        source.dataChanged.connect(self._on_source_data_changed)
+
+    def sourceModel(self):
+        return self._source
+
+    # --- Index ---
+
+    def _build_index(self):
+        by_name: dict[str, _Group] = {}
+        family_cache: dict[str, str] = {}
+
+        def group_for(action: str) -> _Group:
+            fam = family_cache.get(action)
+            if fam is None:
+                fam = family_cache[action] = action_family(action)
+            g = by_name.get(fam)
+            if g is None:
+                g = by_name[fam] = _Group(fam)
+            return g
+
+        src = self._source
+        row_groups = []
+        for row, kb in enumerate(src._keybinds):
+            g = group_for(kb.action)
+            g.add(range(row, row + 1))
+            row_groups.append(g)
+        # Template rows are grouped by their action pattern, without expanding them
+        for start, template in zip(src._template_starts, src._templates):
+            pattern = _PLACEHOLDER.sub("", template.action_pattern)
+            group_for(pattern).add(range(start, start + len(template)))
+
+        self._groups = sorted(by_name.values(), key=lambda g: g.name)
+        position = {id(g): gi for gi, g in enumerate(self._groups)}
+        self._row_group = [position[id(g)] for g in row_groups]
+        for g in self._groups:
+            g.reset_fetch()
+        self._row_lookup = {}
+
+    def _on_source_reset(self):
+        self._build_index()
+        self.endResetModel()
+
+    def set_filter(self, predicate):
+        """Only show keybinds for which predicate(keybind) is true (None shows all)."""
+        self.beginResetModel()
+        self._filter = predicate
+        for g in self._groups:
+            g.reset_fetch()
+        self._row_lookup = {}
+        self.endResetModel()
+
+    def _on_source_data_changed(self, top_left, bottom_right, roles=None):
+        first, last = top_left.row(), bottom_right.row()
+        if self._filter is not None and (not roles or Qt.ItemDataRole.DisplayRole in roles):
+            self._refilter(first, last)
+        # Only fetched rows can be on screen; walk whichever set is smaller
+        if last - first + 1 > len(self._row_lookup):
+            hits = [hit for row, hit in self._row_lookup.items() if first <= row <= last]
+        else:
+            hits = [self._row_lookup[row] for row in range(first, last + 1) if row in self._row_lookup]
+        for gi, ci in hits:
+            parent = self.index(gi, 0)
+            self.dataChanged.emit(self.index(ci, 0, parent), self.index(ci, self.columnCount() - 1, parent))
+
+    def _refilter(self, first: int, last: int):
+        """Re-check edited rows against the filter, removing or inserting them in place."""
+        src = self._source
+        # Only hand-written rows can be edited; generated ones never change
+        for row in range(first, min(last, len(src._keybinds) - 1) + 1):
+            gi = self._row_group[row]
+            group = self._groups[gi]
+            accepted = self._filter(src.keybind_at(row))
+            hit = self._row_lookup.get(row)
+            if hit is not None and not accepted:
+                self._remove_child(gi, hit[1])
+            elif hit is None and accepted and group.scanned(row):
+                self._insert_child(gi, row)
+
+    def _remove_child(self, gi: int, ci: int):
+        group = self._groups[gi]
+        self.beginRemoveRows(self.index(gi, 0), ci, ci)
+        del self._row_lookup[group.children.pop(ci)]
+        for later in range(ci, len(group.children)):
+            self._row_lookup[group.children[later]] = (gi, later)
+        self.endRemoveRows()
+        self._group_changed(gi)
+
+    def _insert_child(self, gi: int, row: int):
+        group = self._groups[gi]
+        ci = bisect_left(group.children, row)
+        self.beginInsertRows(self.index(gi, 0), ci, ci)
+        group.children.insert(ci, row)
+        for later in range(ci, len(group.children)):
+            self._row_lookup[group.children[later]] = (gi, later)
+        self.endInsertRows()
+        self._group_changed(gi)
+
+    def _group_changed(self, gi: int):
+        # The label shows the filtered count once known
+        index = self.index(gi, 0)
+        self.dataChanged.emit(index, index)
+
+    # --- QAbstractItemModel ---
+
+    def index(self, row, column, parent=QModelIndex()):
+        if not self.hasIndex(row, column, parent):
+            return QModelIndex()
+        if not parent.isValid():
+            return self.createIndex(row, column, _GROUP_ID)
+        return self.createIndex(row, column, parent.row() + 1)
+
+    def parent(self, index):
+        if not index.isValid() or index.internalId() == _GROUP_ID:
+            return QModelIndex()
+        return self.createIndex(index.internalId() - 1, 0, _GROUP_ID)
+
+    def rowCount(self, parent=QModelIndex()):
+        if not parent.isValid():
+            return len(self._groups)
+        if parent.internalId() == _GROUP_ID and parent.column() == 0:
+            return len(self._groups[parent.row()].children)
+        return 0
+
+    def columnCount(self, parent=QModelIndex()):
+        return len(self.HEADERS)
+
+    def hasChildren(self, parent=QModelIndex()):
+        if not parent.isValid():
+            return bool(self._groups)
+        if parent.internalId() == _GROUP_ID:
+            group = self._groups[parent.row()]
+            if self._filter is not None and group.pending is None:
+                return bool(group.children)  # Fully fetched: the filtered rows are known
+            return group.total > 0
+        return False
+
+    def canFetchMore(self, parent):
+        if not parent.isValid() or parent.internalId() != _GROUP_ID:
+            return False
+        return self._groups[parent.row()].pending is not None
+
+    def fetchMore(self, parent):
+        if not self.canFetchMore(parent):
+            return
+        gi = parent.row()
+        group = self._groups[gi]
+        batch = []
+        src = self._source
+        # Pull candidates until a batch of accepted rows is found or the group is exhausted
+        for row in group.pending:
+            group.scanned_to = row
+            if self._filter is None or self._filter(src.keybind_at(row)):
+                batch.append(row)
+                if len(batch) >= self.FETCH_BATCH:
+                    break
+        else:
+            group.pending = None
+            self._group_changed(gi)
+        if not batch:
+            return
+        first = len(group.children)
+        self.beginInsertRows(parent, first, first + len(batch) - 1)
+        for offset, row in enumerate(batch):
+            self._row_lookup[row] = (gi, first + offset)
+        group.children.extend(batch)
+        self.endInsertRows()
+
+    def data(self, index, role=Qt.ItemDataRole.DisplayRole):
+        if not index.isValid():
+            return None
+        if index.internalId() == _GROUP_ID:
+            group = self._groups[index.row()]
+            if role == Qt.ItemDataRole.DisplayRole and index.column() == 0:
+                if self._filter is not None and group.pending is None:
+                    return f"{group.name} ({len(group.children)} of {group.total})"
+                return f"{group.name} ({group.total})"
+            return None
+        return self._source.data(self.mapToSource(index), role)
+
+    def headerData(self, section, orientation, role):
+        if role == Qt.ItemDataRole.DisplayRole and orientation == Qt.Orientation.Horizontal:
+            return self.HEADERS[section]
+        return None
+
+    # --- Helpers for the view ---
+
+    def is_group(self, index) -> bool:
+        return index.isValid() and index.internalId() == _GROUP_ID
+
+    def mapToSource(self, index):
+        if not index.isValid() or index.internalId() == _GROUP_ID:
+            return QModelIndex()
+        source_row = self._groups[index.internalId() - 1].children[index.row()]
+        return self._source.index(source_row, index.column())
+
+    def group_source_rows(self, index) -> list[int]:
+        """Every source row in a group, fetched or not (for bulk actions)."""
+        if not self.is_group(index):
+            return []
+        return list(chain.from_iterable(self._groups[index.row()].segments))
@@ -1,12 +1,39 @@
+import json
 import os
 import sys
 
 
+MANIFEST_NAME = "resource_manifest.json"  # Written by tools/make_manifest.py from the .spec data lists
+_manifest: dict | None = None
+
+
+def _load_manifest() -> dict | None:
+    """The bundle's resource manifest (frozen builds only), read once."""
+    global _manifest
+    base = getattr(sys, "_MEIPASS", None)
+    if base is None:
+        return None
+    if _manifest is None:
+        try:
+            with open(os.path.join(base, MANIFEST_NAME), "r", encoding="utf-8") as f:
+                data = json.load(f)
+            data["files"] = set(data.get("files", ()))
+        except (OSError, ValueError, AttributeError):
+            data = {}
+        _manifest = data
+    return _manifest or None
+
+
+def _manifest_key(relative_parts: tuple[str, ...]) -> str:
+    return "/".join(relative_parts).replace("\\", "/")
+
+
 def resource_path(*relative_parts: str) -> str:
     """Return an absolute path to bundled resources.
 
     Works both in development and when frozen by PyInstaller (onefile/onedir).
     Usage: resource_path("assets", "icon.ico") or resource_path("default keys.txt").
+    Frozen builds resolve through the resource manifest without touching the disk.
     """
     base = getattr(sys, "_MEIPASS", os.path.dirname(os.path.abspath(__file__)))
     # Allow passing a single path string with separators
@@ -15,6 +42,9 @@ def resource_path(*relative_parts: str) -> str:
     else:
         candidate = os.path.join(base, *relative_parts)
 
+    if _load_manifest() is not None:
+        return os.path.normpath(candidate)
+
     # If the candidate is a directory and the last part looks like a file, try to find it within
     last = relative_parts[-1] if relative_parts else ""
     if os.path.isdir(candidate) and last and not last.endswith(('/', '\\')):
@@ -22,3 +52,57 @@ def resource_path(*relative_parts: str) -> str:
         if os.path.exists(possible):
             return possible
     return candidate
+
+
+def find_resource(*candidates: str) -> str | None:
+    """Path of the first bundled resource that exists, e.g. find_resource("icon.ico", "icon.png").
+
+    Frozen builds answer from the manifest (no stats); development probes the disk.
+    """
+    manifest = _load_manifest()
+    for rel in candidates:
+        if manifest is not None:
+            if _manifest_key((rel,)) in manifest["files"]:
+                return resource_path(rel)
+        else:
+            path = resource_path(rel)
+            if os.path.exists(path):
+                return path
+    return None
+
+
+def _bundled_defaults_entry(defaults_path: str | None) -> dict | None:
+    manifest = _load_manifest()
+    if manifest is None or not defaults_path or "defaults" not in manifest:
+        return None
+    bundled = resource_path(manifest["defaults"]["path"])
+    if os.path.normcase(os.path.abspath(defaults_path)) != os.path.normcase(bundled):
+        return None
+    return manifest["defaults"]
+
+
+def bundled_defaults(defaults_path: str | None) -> dict[str, list[str]] | None:
+    """Pre-parsed action -> keys table when `defaults_path` is the bundled defaults file."""
+    entry = _bundled_defaults_entry(defaults_path)
+    return entry["actions"] if entry else None
+
+
+def bundled_defaults_digest(defaults_path: str | None) -> str | None:
+    """Build-time SHA-1 of the bundled defaults file, if that's what `defaults_path` is."""
+    entry = _bundled_defaults_entry(defaults_path)
+    return entry.get("sha1") if entry else None
+
+
+def app_data_dir(*relative_parts: str) -> str:
+    """Return (and create) the per-user data folder used for sessions and caches.
+
+    Windows: %APPDATA%\\BAR-Keybinder, elsewhere: $XDG_DATA_HOME/BAR-Keybinder
+    (defaulting to ~/.local/share/BAR-Keybinder).
+    """
+    if sys.platform.startswith("win") and os.environ.get("APPDATA"):
+        root = os.environ["APPDATA"]
+    else:
+        root = os.environ.get("XDG_DATA_HOME") or os.path.join(os.path.expanduser("~"), ".local", "share")
+    path = os.path.join(root, "BAR-Keybinder", *relative_parts)
+    os.makedirs(path, exist_ok=True)
+    return path